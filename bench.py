@@ -0,0 +1,104 @@
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from lib import circuit
+from lib.circuit import Circuit
+from lib.netlist import elaborate
+
+HIGHER_IS_BETTER = {'evals_per_sec'}
+
+
+def circuits():
+    return [
+        cls for cls in vars(circuit).values()
+        if isinstance(cls, type) and issubclass(cls, Circuit) and cls is not Circuit and not cls.OP
+    ]
+
+
+def timed(function, budget):
+    count = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / count
+
+
+def measure(cls, budget):
+    cls().build()
+    instantiate = timed(lambda: cls().build(), budget)
+    c = cls()
+    rnd = random.Random(0)
+
+    def run():
+        c.reset()
+        c.set_inputs(*[rnd.randint(0, 1) for _ in c._in_ports])
+        c.run()
+
+    evaluation = timed(run, budget)
+    tracemalloc.start()
+    c = cls()
+    c.build()
+    c.run()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'instantiate_us': round(instantiate * 1e6, 1),
+        'evals_per_sec': round(1 / evaluation, 1),
+        'gates': len(elaborate(cls)),
+        'objects': len(list(c.walk())) + len(c.probes()),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(name, {}).get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(f"{name}.{metric}: {old} -> {value} ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every circuit in lib/circuit.py")
+    parser.add_argument('names', nargs='*', help="circuit classes to measure (default: all)")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    parser.add_argument('-b', '--baseline', help="JSON results to compare against")
+    parser.add_argument('-t', '--threshold', type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument('--budget', type=float, default=0.2, help="seconds spent per timing")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for cls in circuits():
+        if args.names and cls.__name__ not in args.names:
+            continue
+        results[cls.__name__] = measure(cls, args.budget)
+        print(cls.__name__, ' '.join(f"{k}={v}" for k, v in results[cls.__name__].items()))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+from lib.netlist import elaborate
+from lib.utils import CircuitError
+
+
+def longest(netlist, delay):
+    arrival = {w: 0 for w in netlist.inputs}
+    previous = {}
+    for i in netlist.levelize():
+        op, out, ins = netlist.gates[i]
+        source = max(ins, key=lambda w: arrival.get(w, 0))
+        arrival[out] = arrival.get(source, 0) + delay(op, netlist.names[i])
+        previous[out] = (i, source)
+    ends = netlist.outputs + [d for q, d in netlist.states]
+    if not ends:
+        return 0, []
+    w = max(ends, key=lambda w: arrival.get(w, 0))
+    depth = arrival.get(w, 0)
+    path = []
+    while w in previous:
+        i, w = previous[w]
+        path.append(netlist.names[i])
+    return depth, path[::-1]
+
+
+def logic_delay(op, name):
+    return 0 if op == 'BUF' or name.endswith('.wor') else 1
+
+
+def pass_delay(op, name):
+    return 0 if name.endswith('.wor') else 1
+
+
+@lru_cache(maxsize=None)
+def passes(cls):
+    try:
+        return longest(elaborate(cls, bridges=True), pass_delay)[0] + 1
+    except CircuitError:
+        return None
+
+
+class Analysis:
+    def __init__(self, cls):
+        netlist = elaborate(cls)
+        self.name = cls.__name__
+        self.depth, self.path = longest(netlist, logic_delay)
+        self.passes = passes(cls)
+        self.gates = {}
+        for op, out, ins in netlist.gates:
+            self.gates[op] = self.gates.get(op, 0) + 1
+        fanout = [0] * netlist.size
+        for op, out, ins in netlist.gates:
+            for w in ins:
+                fanout[w] += 1
+        for w in netlist.outputs:
+            fanout[w] += 1
+        names = {out: name for (op, out, ins), name in zip(netlist.gates, netlist.names)}
+        for i, w in enumerate(netlist.inputs):
+            names[w] = f"{self.name}.in{i + 1}"
+        driven = [w for w in names if fanout[w]]
+        self.fanout_max = max((fanout[w] for w in driven), default=0)
+        self.fanout_mean = sum(fanout[w] for w in driven) / len(driven) if driven else 0
+        self.fanout_wire = next((names[w] for w in driven if fanout[w] == self.fanout_max), None)
+
+    def __str__(self):
+        lines = [
+            f"{self.name}: {sum(self.gates.values())} gates "
+            f"({', '.join(f'{op} {n}' for op, n in sorted(self.gates.items()))})",
+            f"depth {self.depth}, run() needs {self.passes} passes",
+            f"fan-out max {self.fanout_max} ({self.fanout_wire}), mean {self.fanout_mean:.2f}",
+            "critical path:",
+        ]
+        lines.extend(f"  {name}" for name in self.path)
+        return '\n'.join(lines)
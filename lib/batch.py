@@ -0,0 +1,109 @@
+from functools import lru_cache
+
+from lib.netlist import ZERO, ONE, Incremental, optimized
+from lib.utils import CircuitError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def pattern(bit, start, lanes):
+    half = 1 << bit
+    if half >= lanes:
+        mask = (1 << lanes) - 1
+        column = mask if start >> bit & 1 else 0
+        edge = half - start % half
+        if edge < lanes:
+            column ^= mask >> edge << edge
+        return column
+    period = 2 << bit
+    block = ((1 << (1 << bit)) - 1) << (1 << bit)
+    offset = start % period
+    blocks = (offset + lanes) // period + 1
+    column = block * ((1 << (period * blocks)) - 1) // ((1 << period) - 1)
+    return (column >> offset) & ((1 << lanes) - 1)
+
+
+def columns(n, start, lanes):
+    return [pattern(n - 1 - i, start, lanes) for i in range(n)]
+
+
+def unpack(outputs, lanes):
+    bits = [format(o, f'0{lanes}b')[::-1] for o in outputs]
+    return [tuple(map(int, vector)) for vector in zip(*bits)]
+
+
+@lru_cache(maxsize=None)
+def truth_table(cls):
+    netlist = optimized(cls)
+    netlist.combinational()
+    lanes = 1 << len(netlist.inputs)
+    outputs = netlist.evaluate_bits(columns(len(netlist.inputs), 0, lanes), lanes)
+    return tuple(unpack(outputs, lanes))
+
+
+@lru_cache(maxsize=None)
+def lookup_table(cls):
+    try:
+        return truth_table(cls)
+    except CircuitError:
+        return None
+
+
+def sweep(cls, lanes=1 << 12):
+    netlist = optimized(cls)
+    n = len(netlist.inputs)
+    total = 1 << n
+    for start in range(0, total, lanes):
+        count = min(lanes, total - start)
+        yield start, count, netlist.evaluate_bits(columns(n, start, count), count)
+
+
+def gray_sweep(cls):
+    netlist = optimized(cls)
+    n = len(netlist.inputs)
+    incremental = Incremental(netlist)
+    inputs = [0] * n
+    yield tuple(inputs), tuple(incremental.evaluate(inputs))
+    for step in range(1, 1 << n):
+        k = n - (step & -step).bit_length()
+        inputs[k] ^= 1
+        yield tuple(inputs), tuple(incremental.flip(k))
+
+
+def evaluate_batch(cls, inputs):
+    if np is None:
+        raise CircuitError("evaluate_batch requires numpy")
+    netlist = optimized(cls)
+    inputs = np.asarray(inputs)
+    if inputs.ndim != 2 or inputs.shape[1] != len(netlist.inputs):
+        raise CircuitError(f"{netlist.name} expects an (N x {len(netlist.inputs)}) array, got {inputs.shape}")
+    rows = inputs.shape[0]
+    packed = np.packbits(inputs.astype(bool, copy=False).T, axis=1)
+    order = netlist.levelize()
+    last = {}
+    for step, i in enumerate(order):
+        for w in netlist.gates[i][2]:
+            last[w] = step
+    for w in netlist.outputs:
+        last[w] = len(order)
+    values = {ZERO: np.zeros(packed.shape[1], np.uint8), ONE: np.full(packed.shape[1], 255, np.uint8)}
+    for w, column in zip(netlist.inputs, packed):
+        values[w] = column
+    for step, i in enumerate(order):
+        op, out, ins = netlist.gates[i]
+        if op == 'NOT':
+            values[out] = ~values[ins[0]]
+        elif op == 'AND':
+            values[out] = values[ins[0]] & values[ins[1]]
+        else:
+            values[out] = values[ins[0]] | values[ins[1]]
+        for w in set(ins):
+            if w > ONE and last[w] == step:
+                del values[w]
+    result = np.zeros((len(netlist.outputs), packed.shape[1]), np.uint8)
+    for k, w in enumerate(netlist.outputs):
+        result[k] = values[w]
+    return np.unpackbits(result, axis=1, count=rows).T.copy()
@@ -1,32 +1,192 @@
+from lib.analysis import passes
+from lib.batch import lookup_table
+from lib.codegen import compile
 from lib.core import C, Input, Output
-from lib.utils import CircuitError
+from lib.event import EventSimulator
+from lib.netlist import Incremental, optimized
+from lib.stream import stream
+from lib.utils import Bus, CircuitError
+from lib.words import words
+
+
+TEMPLATES = {}
+
+
+def port_number(item):
+    digits = item[0][2:] if item[0].startswith('in') else item[0][3:]
+    return int(digits) if digits.isdigit() else 0
+
+
+class Template:
+    def __init__(self, elements, ports, wires):
+        self.elements = elements
+        self.ports = ports
+        self.wires = wires
+        paths = [path for name, is_input, path in ports if path is not None]
+        self.lazy = len(set(paths)) == len(paths) and all(
+            TEMPLATES.get(elements[i][0]) and TEMPLATES[elements[i][0]].lazy for i, port in paths
+        )
 
 
 class Circuit:
     ELEMENTS = {}
+    OP = None
+    DELAY = 0
+    LUT_INPUTS = 0
+    IN_BUSES = ()
+    OUT_BUSES = ()
+    _elements = None
+    _in_ports = ()
+    _out_ports = ()
+    _set = ()
+    _show = ()
+    _events = None
+    _incremental = None
+    _probes = None
+    _flops = None
 
     def __init__(self, **kwargs):
         self._init = kwargs
-        self._elements = []
+        template = TEMPLATES.get(type(self))
+        if template and template.lazy:
+            in_ports = []
+            out_ports = []
+            for name, is_input, path in template.ports:
+                contact = Input() if is_input else Output()
+                setattr(self, name, contact)
+                if is_input:
+                    in_ports.append((name, contact))
+                else:
+                    out_ports.append((name, contact))
+            self._in_ports = tuple(in_ports)
+            self._out_ports = tuple(out_ports)
+        else:
+            self.build()
+        if kwargs:
+            self.bind()
+
+    @classmethod
+    def element(cls, ports=None):
+        e = cls.__new__(cls)
+        e._init = {}
+        template = TEMPLATES.get(cls)
+        if template:
+            e.instantiate(template, ports or {})
+        else:
+            e.construct()
+        return e
+
+    def __getattr__(self, name):
+        if self._elements is None and not name.startswith('_'):
+            self.build()
+            return getattr(self, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def build(self):
+        if self._elements is not None:
+            return
+        template = TEMPLATES.get(type(self))
+        if template:
+            self.instantiate(template, dict(self._in_ports + self._out_ports))
+        else:
+            self.construct()
+        if self._init:
+            self.bind()
+
+    def construct(self):
+        self._elements = ()
+        record = True
+        elements = []
+        index = {}
         for elem, names in self.ELEMENTS.items():
             for n in names:
-                e = elem()
-                self._elements.append(e)
+                e = elem.element()
+                for port, c in e._in_ports + e._out_ports:
+                    index.setdefault(id(c), (len(elements), port))
+                elements.append(e)
                 setattr(self, n, e)
-        self._input_names = []
-        for name, contact in self.inout().items():
+        self._elements = tuple(elements)
+        inputs = []
+        in_ports = []
+        out_ports = []
+        ports = []
+        for name, contact in sorted(self.inout().items(), key=port_number):
             if not (name.startswith('in') or name.startswith('out')):
                 raise CircuitError("Bad contacts name")
-            if contact:
-                setattr(self, name, contact)
-            elif name.startswith("in"):
-                setattr(self, name, Input())
-                self._input_names.append(name)
+            if contact and id(contact) not in index:
+                record = False
+            ports.append((name, name.startswith('in'), index.get(id(contact)) if contact else None))
+            if not contact:
+                contact = Input() if name.startswith('in') else Output()
+                if name.startswith('in'):
+                    inputs.append(contact)
+                index[id(contact)] = (-1, name)
+            setattr(self, name, contact)
+            if name.startswith('in'):
+                in_ports.append((name, contact))
+            else:
+                out_ports.append((name, contact))
+        self._inputs = tuple(inputs)
+        self._in_ports = tuple(in_ports)
+        self._out_ports = tuple(out_ports)
+        wires = tuple(tuple(c) for c in self.connect())
+        self._conductors = tuple(C(*c) for c in wires)
+        if type(self) not in TEMPLATES:
+            paths = tuple(tuple(index.get(id(c)) for c in wire) for wire in wires)
+            if not record or any(None in wire for wire in paths):
+                TEMPLATES[type(self)] = False
+            else:
+                TEMPLATES[type(self)] = Template(
+                    tuple((elem, n) for elem, names in self.ELEMENTS.items() for n in names),
+                    tuple(ports),
+                    paths
+                )
+
+    def instantiate(self, template, ports):
+        given = {}
+        for name, is_input, path in template.ports:
+            if path is not None and name in ports:
+                given.setdefault(path[0], {})[path[1]] = ports[name]
+        elements = []
+        for i, (elem, n) in enumerate(template.elements):
+            e = elem.element(given.get(i))
+            elements.append(e)
+            setattr(self, n, e)
+        self._elements = tuple(elements)
+        inputs = []
+        in_ports = []
+        out_ports = []
+        for name, is_input, path in template.ports:
+            if path is None:
+                contact = ports.get(name) or (Input() if is_input else Output())
+                if is_input:
+                    inputs.append(contact)
             else:
-                setattr(self, name, Output())
-        self._conductors = []
-        for c in self.connect():
-            self._conductors.append(C(*c))
+                contact = getattr(elements[path[0]], path[1])
+            setattr(self, name, contact)
+            if is_input:
+                in_ports.append((name, contact))
+            else:
+                out_ports.append((name, contact))
+        self._inputs = tuple(inputs)
+        self._in_ports = tuple(in_ports)
+        self._out_ports = tuple(out_ports)
+        self._conductors = tuple(
+            C(*[getattr(self, n) if i < 0 else getattr(elements[i], n) for i, n in wire])
+            for wire in template.wires
+        )
+
+    def bind(self):
+        ports = dict(self._in_ports + self._out_ports)
+        self._set = []
+        self._show = []
+        for n, value in self._init.items():
+            if n not in ports:
+                raise CircuitError(f"{type(self).__name__} has no contact {n}")
+            if n.startswith('in'):
+                self._set.append((ports[n], value))
+            else:
+                self._show.append((ports[n], value))
 
     def inout(self):
         return {}
@@ -35,25 +195,136 @@ class Circuit:
         return ()
 
     def update(self):
-        for n, value in self._init.items():
-            c = getattr(self, n)
-            if n.startswith('in'):
-                c.value = value
-            else:
-                value.value = c.value
+        if self._elements is None:
+            self.build()
+        for c, value in self._set:
+            c.value = value
+        for c, cell in self._show:
+            cell.value = c.value
+        if self.ELEMENTS and len(self._in_ports) <= self.LUT_INPUTS:
+            table = lookup_table(type(self))
+            if table:
+                self.lookup(table)
+                return
         for g in self._elements:
             g.update()
         for c in self._conductors:
             c.update()
-        for n in self._input_names:
-            getattr(self, n).update()
+        for c in self._inputs:
+            c.update()
 
-    def run(self, n=100):
-        for _ in range(n):
+    def lookup(self, table):
+        k = 0
+        for n, c in self._in_ports:
+            c.update()
+            k = k << 1 | (1 if c.value else 0)
+        for (n, c), value in zip(self._out_ports, table[k]):
+            c.value = value
+
+    def walk(self):
+        self.build()
+        yield self
+        for e in self._elements:
+            yield from e.walk()
+
+    def probes(self):
+        if self._probes is None:
+            probes = {}
+            for circuit in self.walk():
+                for n, c in circuit._in_ports + circuit._out_ports:
+                    probes[id(c)] = c
+                for c in circuit._conductors:
+                    probes[id(c)] = c
+            self._probes = list(probes.values())
+        return self._probes
+
+    def reset(self):
+        for p in self.probes():
+            p.value = 0
+        self._events = None
+        self._incremental = None
+
+    def run(self, n=None, converge=False):
+        self.build()
+        if n is None:
+            n = 100 if converge else passes(type(self)) or 100
+        if not converge:
+            for _ in range(n):
+                self.update()
+            return n
+        probes = self.probes()
+        seen = {}
+        state = tuple(p.value for p in probes)
+        for i in range(n):
+            seen[state] = i
             self.update()
+            new = tuple(p.value for p in probes)
+            if new == state:
+                return i + 1
+            if new in seen:
+                raise CircuitError(f"{type(self).__name__} oscillates with period {i + 1 - seen[new]}")
+            state = new
+        raise CircuitError(f"{type(self).__name__} does not settle in {n} passes")
+
+    def clock(self, cycles=1):
+        if self._flops is None:
+            self._flops = [c for c in self.walk() if c.OP == 'DFF']
+        outputs = None
+        for _ in range(cycles):
+            self.run()
+            outputs = self.outputs()
+            for f, value in [(f, f.in1.value) for f in self._flops]:
+                f.out1.value = value
+        return outputs
+
+    def propagate(self):
+        if self._events is None:
+            self._events = EventSimulator(self)
+        return self._events.run()
+
+    def set_inputs(self, *values, **named):
+        if len(values) > len(self._in_ports):
+            raise CircuitError(f"{type(self).__name__} takes {len(self._in_ports)} inputs, got {len(values)}")
+        for (n, c), value in zip(self._in_ports, values):
+            named[n] = value
+        self._init.update(named)
+        self.bind()
+        return self
+
+    def evaluate(self, lazy=False, incremental=False):
+        for c, value in self._set:
+            c.value = value
+        inputs = [1 if c.value else 0 for n, c in self._in_ports]
+        netlist = optimized(type(self))
+        netlist.combinational()
+        if incremental:
+            if self._incremental is None:
+                self._incremental = Incremental(netlist)
+            outputs = self._incremental.evaluate(inputs)
+        elif lazy:
+            outputs = netlist.demand(inputs)
+        else:
+            outputs = list(compile(type(self))(*inputs))
+        for (n, c), value in zip(self._out_ports, outputs):
+            c.value = value
+        for c, cell in self._show:
+            cell.value = c.value
+        return outputs
+
+    @classmethod
+    def eval_words(cls, *args, **kwargs):
+        return words(cls)(*args, **kwargs)
+
+    def stream(self, vectors, batch=256):
+        return stream(type(self), vectors, batch)
+
+    def outputs(self):
+        return [c.value for n, c in self._out_ports]
 
 
 class Bridge(Circuit):
+    OP = 'BUF'
+
     def inout(self):
         return {
             "in1": None,
@@ -66,6 +337,9 @@ class Bridge(Circuit):
 
 
 class NOT(Circuit):
+    OP = 'NOT'
+    DELAY = 1
+
     def inout(self):
         return {
             "in1": None,
@@ -78,6 +352,9 @@ class NOT(Circuit):
 
 
 class AND(Circuit):
+    OP = 'AND'
+    DELAY = 1
+
     def inout(self):
         return {
             "in1": None,
@@ -91,6 +368,9 @@ class AND(Circuit):
 
 
 class OR(Circuit):
+    OP = 'OR'
+    DELAY = 1
+
     def inout(self):
         return {
             "in1": None,
@@ -103,6 +383,16 @@ class OR(Circuit):
         self.out1.value = int(self.in1.value or self.in2.value)
 
 
+class DFF(Circuit):
+    OP = 'DFF'
+
+    def inout(self):
+        return {
+            "in1": None,
+            "out1": None
+        }
+
+
 class NOR(Circuit):
     ELEMENTS = {
         OR: ("o1",),
@@ -495,6 +785,8 @@ class AND8el(Circuit):
 
 
 class NOT8(Circuit):
+    IN_BUSES = (Bus('a'),)
+    OUT_BUSES = (Bus('out'),)
     ELEMENTS = {
         NOT: ('n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7', 'n8')
     }
@@ -521,6 +813,8 @@ class NOT8(Circuit):
 
 
 class OR8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out'),)
     ELEMENTS = {
         OR: ('o1', 'o2', 'o3', 'o4', 'o5', 'o6', 'o7', 'o8')
     }
@@ -555,6 +849,8 @@ class OR8(Circuit):
 
 
 class AND8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out'),)
     ELEMENTS = {
         AND: ('a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7', 'a8')
     }
@@ -616,6 +912,8 @@ class OR8el(Circuit):
 
 
 class EQ8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 1),)
     ELEMENTS = {
         XNOR: ('x1', 'x2', 'x3', 'x4', 'x5', 'x6', 'x7', 'x8'),
         AND8el: ('a1',)
@@ -656,6 +954,8 @@ class EQ8(Circuit):
 
 
 class NEQ8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 1),)
     ELEMENTS = {
         EQ8: ('e1',),
         NOT: ('n1',),
@@ -707,6 +1007,8 @@ class GT(Circuit):
 
 
 class GT8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 1),)
     ELEMENTS = {
         Bridge: ('b1', 'b2', 'b3', 'b4', 'b5', 'b6', 'b7', 'b8', 'b9', 'b10', 'b11', 'b12', 'b13', 'b14', 'b15', 'b16'),
         XNOR: ('x8', 'x7', 'x6', 'x5', 'x4', 'x3', 'x2'),
@@ -819,6 +1121,8 @@ class GT8(Circuit):
 
 
 class GTE8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 1),)
     ELEMENTS = {
         Bridge: ('b1', 'b2', 'b3', 'b4', 'b5', 'b6', 'b7', 'b8', 'b9', 'b10', 'b11', 'b12', 'b13', 'b14', 'b15', 'b16'),
         GT8: ('g1',),
@@ -871,6 +1175,8 @@ class GTE8(Circuit):
 
 
 class LT8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 1),)
     ELEMENTS = {
         GTE8: ('g1',),
         NOT: ('n1',)
@@ -904,6 +1210,8 @@ class LT8(Circuit):
 
 
 class LTE8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 1),)
     ELEMENTS = {
         GT8: ('g1',),
         NOT: ('n1',)
@@ -937,6 +1245,8 @@ class LTE8(Circuit):
 
 
 class ADD8(Circuit):
+    IN_BUSES = (Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('sum', 8, lsb_first=True), Bus('carry', 1))
     ELEMENTS = {
         ADD: ('a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7', 'a8', 'a9'),
     }
@@ -982,5 +1292,774 @@ class ADD8(Circuit):
         )
 
 
+class DC4(Circuit):
+    ELEMENTS = {
+        Bridge: ('b1', 'b2', 'b3', 'b4'),
+        NOT: ('n1', 'n2', 'n3', 'n4'),
+        AND4: ('a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7', 'a8', 'a9', 'a10'),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.b1.in1,
+            'in2': self.b2.in1,
+            'in3': self.b3.in1,
+            'in4': self.b4.in1,
+            'out1': self.a1.out1,
+            'out2': self.a2.out1,
+            'out3': self.a3.out1,
+            'out4': self.a4.out1,
+            'out5': self.a5.out1,
+            'out6': self.a6.out1,
+            'out7': self.a7.out1,
+            'out8': self.a8.out1,
+            'out9': self.a9.out1,
+            'out10': self.a10.out1,
+        }
+
+    def connect(self):
+        return (
+            (self.b1.out1, self.n1.in1, self.a9.in1, self.a10.in1),
+            (self.b2.out1, self.n2.in1, self.a5.in2, self.a6.in2, self.a7.in2, self.a8.in2),
+            (self.b3.out1, self.n3.in1, self.a3.in3, self.a4.in3, self.a7.in3, self.a8.in3),
+            (self.b4.out1, self.n4.in1, self.a2.in4, self.a4.in4, self.a6.in4, self.a8.in4, self.a10.in4),
+            (
+                self.n1.out1,
+                self.a1.in1,
+                self.a2.in1,
+                self.a3.in1,
+                self.a4.in1,
+                self.a5.in1,
+                self.a6.in1,
+                self.a7.in1,
+                self.a8.in1,
+            ),
+            (
+                self.n2.out1,
+                self.a1.in2,
+                self.a2.in2,
+                self.a3.in2,
+                self.a4.in2,
+                self.a9.in2,
+                self.a10.in2,
+            ),
+            (
+                self.n3.out1,
+                self.a1.in3,
+                self.a2.in3,
+                self.a5.in3,
+                self.a6.in3,
+                self.a9.in3,
+                self.a10.in3,
+            ),
+            (
+                self.n4.out1,
+                self.a1.in4,
+                self.a3.in4,
+                self.a5.in4,
+                self.a7.in4,
+                self.a9.in4,
+            ),
+        )
+
+
+class SEL8(Circuit):
+    ELEMENTS = {
+        Bridge: ('b1',),
+        AND: ('a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7', 'a8'),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.b1.in1,
+            'in2': self.a1.in2,
+            'in3': self.a2.in2,
+            'in4': self.a3.in2,
+            'in5': self.a4.in2,
+            'in6': self.a5.in2,
+            'in7': self.a6.in2,
+            'in8': self.a7.in2,
+            'in9': self.a8.in2,
+            'out1': self.a1.out1,
+            'out2': self.a2.out1,
+            'out3': self.a3.out1,
+            'out4': self.a4.out1,
+            'out5': self.a5.out1,
+            'out6': self.a6.out1,
+            'out7': self.a7.out1,
+            'out8': self.a8.out1,
+        }
+
+    def connect(self):
+        return (
+            (
+                self.b1.out1,
+                self.a1.in1,
+                self.a2.in1,
+                self.a3.in1,
+                self.a4.in1,
+                self.a5.in1,
+                self.a6.in1,
+                self.a7.in1,
+                self.a8.in1,
+            ),
+        )
+
+
 class ALU(Circuit):
-    pass
+    IN_BUSES = (Bus('op', 4), Bus('a'), Bus('b'))
+    OUT_BUSES = (Bus('out', 9),)
+    UNITS = (NOT8, OR8, AND8, EQ8, NEQ8, GT8, LT8, GTE8, LTE8, ADD8)
+    ELEMENTS = {
+        Bridge: ('b1', 'b2', 'b3', 'b4', 'b5', 'b6', 'b7', 'b8', 'b9', 'b10', 'b11', 'b12', 'b13', 'b14', 'b15', 'b16'),
+        DC4: ('d1',),
+        NOT8: ('u0',),
+        OR8: ('u1', 'o1', 'o2', 'o3'),
+        AND8: ('u2',),
+        EQ8: ('u3',),
+        NEQ8: ('u4',),
+        GT8: ('u5',),
+        LT8: ('u6',),
+        GTE8: ('u7',),
+        LTE8: ('u8',),
+        ADD8: ('u9',),
+        SEL8: ('s0', 's1', 's2', 's9'),
+        AND: ('a3', 'a4', 'a5', 'a6', 'a7', 'a8', 'a9'),
+        OR8el: ('o4',),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.d1.in1,
+            'in2': self.d1.in2,
+            'in3': self.d1.in3,
+            'in4': self.d1.in4,
+            'in5': self.b1.in1,
+            'in6': self.b2.in1,
+            'in7': self.b3.in1,
+            'in8': self.b4.in1,
+            'in9': self.b5.in1,
+            'in10': self.b6.in1,
+            'in11': self.b7.in1,
+            'in12': self.b8.in1,
+            'in13': self.b9.in1,
+            'in14': self.b10.in1,
+            'in15': self.b11.in1,
+            'in16': self.b12.in1,
+            'in17': self.b13.in1,
+            'in18': self.b14.in1,
+            'in19': self.b15.in1,
+            'in20': self.b16.in1,
+            'out1': self.o4.out1,
+            'out2': self.o3.out2,
+            'out3': self.o3.out3,
+            'out4': self.o3.out4,
+            'out5': self.o3.out5,
+            'out6': self.o3.out6,
+            'out7': self.o3.out7,
+            'out8': self.o3.out8,
+            'out9': self.a9.out1,
+        }
+
+    def connect(self):
+        return (
+            (
+                self.b1.out1,
+                self.u0.in1,
+                self.u1.in1,
+                self.u2.in1,
+                self.u3.in1,
+                self.u4.in1,
+                self.u5.in1,
+                self.u6.in1,
+                self.u7.in1,
+                self.u8.in1,
+                self.u9.in1,
+            ),
+            (
+                self.b2.out1,
+                self.u0.in2,
+                self.u1.in2,
+                self.u2.in2,
+                self.u3.in2,
+                self.u4.in2,
+                self.u5.in2,
+                self.u6.in2,
+                self.u7.in2,
+                self.u8.in2,
+                self.u9.in2,
+            ),
+            (
+                self.b3.out1,
+                self.u0.in3,
+                self.u1.in3,
+                self.u2.in3,
+                self.u3.in3,
+                self.u4.in3,
+                self.u5.in3,
+                self.u6.in3,
+                self.u7.in3,
+                self.u8.in3,
+                self.u9.in3,
+            ),
+            (
+                self.b4.out1,
+                self.u0.in4,
+                self.u1.in4,
+                self.u2.in4,
+                self.u3.in4,
+                self.u4.in4,
+                self.u5.in4,
+                self.u6.in4,
+                self.u7.in4,
+                self.u8.in4,
+                self.u9.in4,
+            ),
+            (
+                self.b5.out1,
+                self.u0.in5,
+                self.u1.in5,
+                self.u2.in5,
+                self.u3.in5,
+                self.u4.in5,
+                self.u5.in5,
+                self.u6.in5,
+                self.u7.in5,
+                self.u8.in5,
+                self.u9.in5,
+            ),
+            (
+                self.b6.out1,
+                self.u0.in6,
+                self.u1.in6,
+                self.u2.in6,
+                self.u3.in6,
+                self.u4.in6,
+                self.u5.in6,
+                self.u6.in6,
+                self.u7.in6,
+                self.u8.in6,
+                self.u9.in6,
+            ),
+            (
+                self.b7.out1,
+                self.u0.in7,
+                self.u1.in7,
+                self.u2.in7,
+                self.u3.in7,
+                self.u4.in7,
+                self.u5.in7,
+                self.u6.in7,
+                self.u7.in7,
+                self.u8.in7,
+                self.u9.in7,
+            ),
+            (
+                self.b8.out1,
+                self.u0.in8,
+                self.u1.in8,
+                self.u2.in8,
+                self.u3.in8,
+                self.u4.in8,
+                self.u5.in8,
+                self.u6.in8,
+                self.u7.in8,
+                self.u8.in8,
+                self.u9.in8,
+            ),
+            (
+                self.b9.out1,
+                self.u1.in9,
+                self.u2.in9,
+                self.u3.in9,
+                self.u4.in9,
+                self.u5.in9,
+                self.u6.in9,
+                self.u7.in9,
+                self.u8.in9,
+                self.u9.in9,
+            ),
+            (
+                self.b10.out1,
+                self.u1.in10,
+                self.u2.in10,
+                self.u3.in10,
+                self.u4.in10,
+                self.u5.in10,
+                self.u6.in10,
+                self.u7.in10,
+                self.u8.in10,
+                self.u9.in10,
+            ),
+            (
+                self.b11.out1,
+                self.u1.in11,
+                self.u2.in11,
+                self.u3.in11,
+                self.u4.in11,
+                self.u5.in11,
+                self.u6.in11,
+                self.u7.in11,
+                self.u8.in11,
+                self.u9.in11,
+            ),
+            (
+                self.b12.out1,
+                self.u1.in12,
+                self.u2.in12,
+                self.u3.in12,
+                self.u4.in12,
+                self.u5.in12,
+                self.u6.in12,
+                self.u7.in12,
+                self.u8.in12,
+                self.u9.in12,
+            ),
+            (
+                self.b13.out1,
+                self.u1.in13,
+                self.u2.in13,
+                self.u3.in13,
+                self.u4.in13,
+                self.u5.in13,
+                self.u6.in13,
+                self.u7.in13,
+                self.u8.in13,
+                self.u9.in13,
+            ),
+            (
+                self.b14.out1,
+                self.u1.in14,
+                self.u2.in14,
+                self.u3.in14,
+                self.u4.in14,
+                self.u5.in14,
+                self.u6.in14,
+                self.u7.in14,
+                self.u8.in14,
+                self.u9.in14,
+            ),
+            (
+                self.b15.out1,
+                self.u1.in15,
+                self.u2.in15,
+                self.u3.in15,
+                self.u4.in15,
+                self.u5.in15,
+                self.u6.in15,
+                self.u7.in15,
+                self.u8.in15,
+                self.u9.in15,
+            ),
+            (
+                self.b16.out1,
+                self.u1.in16,
+                self.u2.in16,
+                self.u3.in16,
+                self.u4.in16,
+                self.u5.in16,
+                self.u6.in16,
+                self.u7.in16,
+                self.u8.in16,
+                self.u9.in16,
+            ),
+
+            (self.d1.out1, self.s0.in1),
+            (self.d1.out2, self.s1.in1),
+            (self.d1.out3, self.s2.in1),
+            (self.d1.out4, self.a3.in1),
+            (self.d1.out5, self.a4.in1),
+            (self.d1.out6, self.a5.in1),
+            (self.d1.out7, self.a6.in1),
+            (self.d1.out8, self.a7.in1),
+            (self.d1.out9, self.a8.in1),
+            (self.d1.out10, self.s9.in1, self.a9.in1),
+
+            (self.u0.out1, self.s0.in2),
+            (self.u0.out2, self.s0.in3),
+            (self.u0.out3, self.s0.in4),
+            (self.u0.out4, self.s0.in5),
+            (self.u0.out5, self.s0.in6),
+            (self.u0.out6, self.s0.in7),
+            (self.u0.out7, self.s0.in8),
+            (self.u0.out8, self.s0.in9),
+            (self.u1.out1, self.s1.in2),
+            (self.u1.out2, self.s1.in3),
+            (self.u1.out3, self.s1.in4),
+            (self.u1.out4, self.s1.in5),
+            (self.u1.out5, self.s1.in6),
+            (self.u1.out6, self.s1.in7),
+            (self.u1.out7, self.s1.in8),
+            (self.u1.out8, self.s1.in9),
+            (self.u2.out1, self.s2.in2),
+            (self.u2.out2, self.s2.in3),
+            (self.u2.out3, self.s2.in4),
+            (self.u2.out4, self.s2.in5),
+            (self.u2.out5, self.s2.in6),
+            (self.u2.out6, self.s2.in7),
+            (self.u2.out7, self.s2.in8),
+            (self.u2.out8, self.s2.in9),
+            (self.u9.out1, self.s9.in2),
+            (self.u9.out2, self.s9.in3),
+            (self.u9.out3, self.s9.in4),
+            (self.u9.out4, self.s9.in5),
+            (self.u9.out5, self.s9.in6),
+            (self.u9.out6, self.s9.in7),
+            (self.u9.out7, self.s9.in8),
+            (self.u9.out8, self.s9.in9),
+            (self.u3.out1, self.a3.in2),
+            (self.u4.out1, self.a4.in2),
+            (self.u5.out1, self.a5.in2),
+            (self.u6.out1, self.a6.in2),
+            (self.u7.out1, self.a7.in2),
+            (self.u8.out1, self.a8.in2),
+            (self.u9.out9, self.a9.in2),
+
+            (self.s0.out1, self.o1.in1),
+            (self.s0.out2, self.o1.in2),
+            (self.s0.out3, self.o1.in3),
+            (self.s0.out4, self.o1.in4),
+            (self.s0.out5, self.o1.in5),
+            (self.s0.out6, self.o1.in6),
+            (self.s0.out7, self.o1.in7),
+            (self.s0.out8, self.o1.in8),
+            (self.s1.out1, self.o1.in9),
+            (self.s1.out2, self.o1.in10),
+            (self.s1.out3, self.o1.in11),
+            (self.s1.out4, self.o1.in12),
+            (self.s1.out5, self.o1.in13),
+            (self.s1.out6, self.o1.in14),
+            (self.s1.out7, self.o1.in15),
+            (self.s1.out8, self.o1.in16),
+            (self.s2.out1, self.o2.in1),
+            (self.s2.out2, self.o2.in2),
+            (self.s2.out3, self.o2.in3),
+            (self.s2.out4, self.o2.in4),
+            (self.s2.out5, self.o2.in5),
+            (self.s2.out6, self.o2.in6),
+            (self.s2.out7, self.o2.in7),
+            (self.s2.out8, self.o2.in8),
+            (self.s9.out1, self.o2.in9),
+            (self.s9.out2, self.o2.in10),
+            (self.s9.out3, self.o2.in11),
+            (self.s9.out4, self.o2.in12),
+            (self.s9.out5, self.o2.in13),
+            (self.s9.out6, self.o2.in14),
+            (self.s9.out7, self.o2.in15),
+            (self.s9.out8, self.o2.in16),
+            (self.o1.out1, self.o3.in1),
+            (self.o1.out2, self.o3.in2),
+            (self.o1.out3, self.o3.in3),
+            (self.o1.out4, self.o3.in4),
+            (self.o1.out5, self.o3.in5),
+            (self.o1.out6, self.o3.in6),
+            (self.o1.out7, self.o3.in7),
+            (self.o1.out8, self.o3.in8),
+            (self.o2.out1, self.o3.in9),
+            (self.o2.out2, self.o3.in10),
+            (self.o2.out3, self.o3.in11),
+            (self.o2.out4, self.o3.in12),
+            (self.o2.out5, self.o3.in13),
+            (self.o2.out6, self.o3.in14),
+            (self.o2.out7, self.o3.in15),
+            (self.o2.out8, self.o3.in16),
+            (self.o3.out1, self.o4.in1),
+            (self.a3.out1, self.o4.in2),
+            (self.a4.out1, self.o4.in3),
+            (self.a5.out1, self.o4.in4),
+            (self.a6.out1, self.o4.in5),
+            (self.a7.out1, self.o4.in6),
+            (self.a8.out1, self.o4.in7),
+        )
+
+    @classmethod
+    def eval_words(cls, op, a, b=0):
+        if not 0 <= op < len(cls.UNITS):
+            raise CircuitError(f"{cls.__name__} has no opcode {op}")
+        packer = words(cls)
+        return words(cls.UNITS[op]).decode(packer.function(*packer.encode((op, a, b), {})))
+
+
+class REG(Circuit):
+    ELEMENTS = {
+        Bridge: ('b1',),
+        NOT: ('n1',),
+        AND: ('a1', 'a2'),
+        OR: ('o1',),
+        DFF: ('f1',),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.a1.in1,
+            'in2': self.b1.in1,
+            'out1': self.f1.out1,
+        }
+
+    def connect(self):
+        return (
+            (self.b1.out1, self.a1.in2, self.n1.in1),
+            (self.n1.out1, self.a2.in2),
+            (self.f1.out1, self.a2.in1),
+            (self.a1.out1, self.o1.in1),
+            (self.a2.out1, self.o1.in2),
+            (self.o1.out1, self.f1.in1),
+        )
+
+
+class REG8(Circuit):
+    ELEMENTS = {
+        Bridge: ('b1',),
+        REG: ('r1', 'r2', 'r3', 'r4', 'r5', 'r6', 'r7', 'r8'),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.r1.in1,
+            'in2': self.r2.in1,
+            'in3': self.r3.in1,
+            'in4': self.r4.in1,
+            'in5': self.r5.in1,
+            'in6': self.r6.in1,
+            'in7': self.r7.in1,
+            'in8': self.r8.in1,
+            'in9': self.b1.in1,
+            'out1': self.r1.out1,
+            'out2': self.r2.out1,
+            'out3': self.r3.out1,
+            'out4': self.r4.out1,
+            'out5': self.r5.out1,
+            'out6': self.r6.out1,
+            'out7': self.r7.out1,
+            'out8': self.r8.out1,
+        }
+
+    def connect(self):
+        return (
+            (
+                self.b1.out1,
+                self.r1.in2,
+                self.r2.in2,
+                self.r3.in2,
+                self.r4.in2,
+                self.r5.in2,
+                self.r6.in2,
+                self.r7.in2,
+                self.r8.in2,
+            ),
+        )
+
+
+class DC2(Circuit):
+    ELEMENTS = {
+        Bridge: ('b1', 'b2'),
+        NOT: ('n1', 'n2'),
+        AND: ('a1', 'a2', 'a3', 'a4'),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.b1.in1,
+            'in2': self.b2.in1,
+            'out1': self.a1.out1,
+            'out2': self.a2.out1,
+            'out3': self.a3.out1,
+            'out4': self.a4.out1,
+        }
+
+    def connect(self):
+        return (
+            (self.b1.out1, self.n1.in1, self.a3.in1, self.a4.in1),
+            (self.b2.out1, self.n2.in1, self.a2.in2, self.a4.in2),
+            (self.n1.out1, self.a1.in1, self.a2.in1),
+            (self.n2.out1, self.a1.in2, self.a3.in2),
+        )
+
+
+class REGFILE(Circuit):
+    ELEMENTS = {
+        Bridge: ('b1', 'b2', 'b3', 'b4', 'b5', 'b6', 'b7', 'b8', 'b9'),
+        DC2: ('d1', 'd2'),
+        AND: ('w1', 'w2', 'w3', 'w4'),
+        REG8: ('r1', 'r2', 'r3', 'r4'),
+        SEL8: ('s1', 's2', 's3', 's4'),
+        OR8: ('o1', 'o2', 'o3'),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.b9.in1,
+            'in2': self.d1.in1,
+            'in3': self.d1.in2,
+            'in4': self.b1.in1,
+            'in5': self.b2.in1,
+            'in6': self.b3.in1,
+            'in7': self.b4.in1,
+            'in8': self.b5.in1,
+            'in9': self.b6.in1,
+            'in10': self.b7.in1,
+            'in11': self.b8.in1,
+            'in12': self.d2.in1,
+            'in13': self.d2.in2,
+            'out1': self.o3.out1,
+            'out2': self.o3.out2,
+            'out3': self.o3.out3,
+            'out4': self.o3.out4,
+            'out5': self.o3.out5,
+            'out6': self.o3.out6,
+            'out7': self.o3.out7,
+            'out8': self.o3.out8,
+        }
+
+    def connect(self):
+        return (
+            (self.b9.out1, self.w1.in1, self.w2.in1, self.w3.in1, self.w4.in1),
+            (self.d1.out1, self.w1.in2),
+            (self.d1.out2, self.w2.in2),
+            (self.d1.out3, self.w3.in2),
+            (self.d1.out4, self.w4.in2),
+            (self.w1.out1, self.r1.in9),
+            (self.w2.out1, self.r2.in9),
+            (self.w3.out1, self.r3.in9),
+            (self.w4.out1, self.r4.in9),
+            (self.b1.out1, self.r1.in1, self.r2.in1, self.r3.in1, self.r4.in1),
+            (self.b2.out1, self.r1.in2, self.r2.in2, self.r3.in2, self.r4.in2),
+            (self.b3.out1, self.r1.in3, self.r2.in3, self.r3.in3, self.r4.in3),
+            (self.b4.out1, self.r1.in4, self.r2.in4, self.r3.in4, self.r4.in4),
+            (self.b5.out1, self.r1.in5, self.r2.in5, self.r3.in5, self.r4.in5),
+            (self.b6.out1, self.r1.in6, self.r2.in6, self.r3.in6, self.r4.in6),
+            (self.b7.out1, self.r1.in7, self.r2.in7, self.r3.in7, self.r4.in7),
+            (self.b8.out1, self.r1.in8, self.r2.in8, self.r3.in8, self.r4.in8),
+            (self.d2.out1, self.s1.in1),
+            (self.d2.out2, self.s2.in1),
+            (self.d2.out3, self.s3.in1),
+            (self.d2.out4, self.s4.in1),
+            (self.r1.out1, self.s1.in2),
+            (self.r1.out2, self.s1.in3),
+            (self.r1.out3, self.s1.in4),
+            (self.r1.out4, self.s1.in5),
+            (self.r1.out5, self.s1.in6),
+            (self.r1.out6, self.s1.in7),
+            (self.r1.out7, self.s1.in8),
+            (self.r1.out8, self.s1.in9),
+            (self.r2.out1, self.s2.in2),
+            (self.r2.out2, self.s2.in3),
+            (self.r2.out3, self.s2.in4),
+            (self.r2.out4, self.s2.in5),
+            (self.r2.out5, self.s2.in6),
+            (self.r2.out6, self.s2.in7),
+            (self.r2.out7, self.s2.in8),
+            (self.r2.out8, self.s2.in9),
+            (self.r3.out1, self.s3.in2),
+            (self.r3.out2, self.s3.in3),
+            (self.r3.out3, self.s3.in4),
+            (self.r3.out4, self.s3.in5),
+            (self.r3.out5, self.s3.in6),
+            (self.r3.out6, self.s3.in7),
+            (self.r3.out7, self.s3.in8),
+            (self.r3.out8, self.s3.in9),
+            (self.r4.out1, self.s4.in2),
+            (self.r4.out2, self.s4.in3),
+            (self.r4.out3, self.s4.in4),
+            (self.r4.out4, self.s4.in5),
+            (self.r4.out5, self.s4.in6),
+            (self.r4.out6, self.s4.in7),
+            (self.r4.out7, self.s4.in8),
+            (self.r4.out8, self.s4.in9),
+            (self.s1.out1, self.o1.in1),
+            (self.s1.out2, self.o1.in2),
+            (self.s1.out3, self.o1.in3),
+            (self.s1.out4, self.o1.in4),
+            (self.s1.out5, self.o1.in5),
+            (self.s1.out6, self.o1.in6),
+            (self.s1.out7, self.o1.in7),
+            (self.s1.out8, self.o1.in8),
+            (self.s2.out1, self.o1.in9),
+            (self.s2.out2, self.o1.in10),
+            (self.s2.out3, self.o1.in11),
+            (self.s2.out4, self.o1.in12),
+            (self.s2.out5, self.o1.in13),
+            (self.s2.out6, self.o1.in14),
+            (self.s2.out7, self.o1.in15),
+            (self.s2.out8, self.o1.in16),
+            (self.s3.out1, self.o2.in1),
+            (self.s3.out2, self.o2.in2),
+            (self.s3.out3, self.o2.in3),
+            (self.s3.out4, self.o2.in4),
+            (self.s3.out5, self.o2.in5),
+            (self.s3.out6, self.o2.in6),
+            (self.s3.out7, self.o2.in7),
+            (self.s3.out8, self.o2.in8),
+            (self.s4.out1, self.o2.in9),
+            (self.s4.out2, self.o2.in10),
+            (self.s4.out3, self.o2.in11),
+            (self.s4.out4, self.o2.in12),
+            (self.s4.out5, self.o2.in13),
+            (self.s4.out6, self.o2.in14),
+            (self.s4.out7, self.o2.in15),
+            (self.s4.out8, self.o2.in16),
+            (self.o1.out1, self.o3.in1),
+            (self.o1.out2, self.o3.in2),
+            (self.o1.out3, self.o3.in3),
+            (self.o1.out4, self.o3.in4),
+            (self.o1.out5, self.o3.in5),
+            (self.o1.out6, self.o3.in6),
+            (self.o1.out7, self.o3.in7),
+            (self.o1.out8, self.o3.in8),
+            (self.o2.out1, self.o3.in9),
+            (self.o2.out2, self.o3.in10),
+            (self.o2.out3, self.o3.in11),
+            (self.o2.out4, self.o3.in12),
+            (self.o2.out5, self.o3.in13),
+            (self.o2.out6, self.o3.in14),
+            (self.o2.out7, self.o3.in15),
+            (self.o2.out8, self.o3.in16),
+        )
+
+
+class ACC8(Circuit):
+    ELEMENTS = {
+        ADD8: ('a1',),
+        REG8: ('r1',),
+    }
+
+    def inout(self):
+        return {
+            'in1': self.a1.in9,
+            'in2': self.a1.in10,
+            'in3': self.a1.in11,
+            'in4': self.a1.in12,
+            'in5': self.a1.in13,
+            'in6': self.a1.in14,
+            'in7': self.a1.in15,
+            'in8': self.a1.in16,
+            'in9': self.r1.in9,
+            'out1': self.r1.out1,
+            'out2': self.r1.out2,
+            'out3': self.r1.out3,
+            'out4': self.r1.out4,
+            'out5': self.r1.out5,
+            'out6': self.r1.out6,
+            'out7': self.r1.out7,
+            'out8': self.r1.out8,
+        }
+
+    def connect(self):
+        return (
+            (self.r1.out1, self.a1.in1),
+            (self.r1.out2, self.a1.in2),
+            (self.r1.out3, self.a1.in3),
+            (self.r1.out4, self.a1.in4),
+            (self.r1.out5, self.a1.in5),
+            (self.r1.out6, self.a1.in6),
+            (self.r1.out7, self.a1.in7),
+            (self.r1.out8, self.a1.in8),
+            (self.a1.out1, self.r1.in8),
+            (self.a1.out2, self.r1.in7),
+            (self.a1.out3, self.r1.in6),
+            (self.a1.out4, self.r1.in5),
+            (self.a1.out5, self.r1.in4),
+            (self.a1.out6, self.r1.in3),
+            (self.a1.out7, self.r1.in2),
+            (self.a1.out8, self.r1.in1),
+        )
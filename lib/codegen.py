@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from lib.netlist import ZERO, ONE, optimized
+
+
+def source(cls):
+    netlist = optimized(cls)
+    names = {ZERO: '0', ONE: '1'}
+    args = []
+    for i, w in enumerate(netlist.inputs):
+        names[w] = f"in{i + 1}"
+        args.append(names[w])
+    for i, (q, d) in enumerate(netlist.states):
+        names[q] = f"q{i + 1}"
+        args.append(names[q])
+    lines = [f"def {netlist.name}({', '.join(args)}):"]
+    for i in netlist.levelize():
+        op, out, ins = netlist.gates[i]
+        names[out] = f"w{out}"
+        if op == 'NOT':
+            lines.append(f"    w{out} = 1 - {names[ins[0]]}")
+        elif op == 'AND':
+            lines.append(f"    w{out} = {names[ins[0]]} & {names[ins[1]]}")
+        else:
+            lines.append(f"    w{out} = {names[ins[0]]} | {names[ins[1]]}")
+    outputs = ''.join(f"{names[w]}, " for w in netlist.outputs + [d for q, d in netlist.states])
+    lines.append(f"    return ({outputs.rstrip()})")
+    return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=None)
+def compile(cls):
+    text = source(cls)
+    namespace = {}
+    exec(text, namespace)
+    function = namespace[cls.__name__]
+    function.source = text
+    return function
@@ -1,37 +1,49 @@
 class Contact:
+    __slots__ = ('conductors', 'value')
+
     def __init__(self):
-        self.conductors = []
+        self.conductors = ()
         self.value = 0
 
     def addConductor(self, c):
-        self.conductors.append(c)
+        self.conductors += (c,)
 
 
 class Input(Contact):
+    __slots__ = ()
+
     def update(self):
-        try:
-            self.value = max([c.value for c in self.conductors])
-        except Exception:
-            pass
+        conductors = self.conductors
+        if len(conductors) == 1:
+            self.value = conductors[0].value
+        elif conductors:
+            self.value = max([c.value for c in conductors])
 
 
 class Output(Contact):
-    pass
+    __slots__ = ()
 
 
 class BaseConductor:
+    __slots__ = ('contacts', 'fanout', 'value')
+
     def __init__(self, *contacts):
-        self.contacts = []
+        drivers = []
+        fanout = []
         for c in contacts:
             if isinstance(c, Output):
-                self.contacts.append(c)
+                drivers.append(c)
             else:
-                c.addConductor(self)
+                fanout.append(c)
+            c.addConductor(self)
+        self.contacts = tuple(drivers)
+        self.fanout = tuple(fanout)
         self.value = 0
 
     def update(self):
-        self.value = max([c.value for c in self.contacts])
+        contacts = self.contacts
+        self.value = contacts[0].value if len(contacts) == 1 else max([c.value for c in contacts])
 
 
 class C(BaseConductor):
-    pass
+    __slots__ = ()
@@ -0,0 +1,59 @@
+from collections import deque
+
+from lib.utils import CircuitError
+
+
+class EventSimulator:
+    def __init__(self, circuit, limit=100):
+        circuit.build()
+        self.circuit = circuit
+        self.limit = limit
+        self.gates = []
+        self.readers = {}
+        self.collect(circuit)
+        self.queue = deque(self.gates)
+        self.queued = set(self.gates)
+        self.evaluations = 0
+
+    def collect(self, circuit):
+        if circuit.OP:
+            self.gates.append(circuit)
+            for n, c in circuit._in_ports:
+                self.readers.setdefault(id(c), []).append(circuit)
+        for e in circuit._elements:
+            self.collect(e)
+
+    def schedule(self, contact):
+        for g in self.readers.get(id(contact), ()):
+            if g not in self.queued:
+                self.queued.add(g)
+                self.queue.append(g)
+
+    def run(self):
+        top = self.circuit
+        for c, value in top._set:
+            if c.value != value:
+                c.value = value
+                self.schedule(c)
+        start = self.evaluations
+        budget = self.limit * max(len(self.gates), 1)
+        while self.queue:
+            g = self.queue.popleft()
+            self.queued.discard(g)
+            old = g.out1.value
+            g.update()
+            self.evaluations += 1
+            if self.evaluations - start > budget:
+                raise CircuitError(f"{type(top).__name__} does not settle")
+            if g.out1.value == old:
+                continue
+            for conductor in g.out1.conductors:
+                conductor.update()
+                for c in conductor.fanout:
+                    old = c.value
+                    c.update()
+                    if c.value != old:
+                        self.schedule(c)
+        for c, cell in top._show:
+            cell.value = c.value
+        return self.evaluations - start
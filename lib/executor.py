@@ -0,0 +1,64 @@
+import os
+import time
+from array import array
+from functools import lru_cache
+
+from lib.circuit import ALU
+from lib.netlist import optimized
+from lib.utils import CircuitError
+from lib.words import words
+
+
+def instructions(program):
+    if isinstance(program, (str, os.PathLike)):
+        with open(program, 'rb') as f:
+            program = f.read()
+    elif hasattr(program, 'read'):
+        program = program.read()
+    if isinstance(program, (bytes, bytearray, memoryview, array)):
+        if len(program) % 3:
+            raise CircuitError(f"Packed program length {len(program)} is not a multiple of 3")
+        it = iter(program)
+        return zip(it, it, it)
+    return program
+
+
+@lru_cache(maxsize=None)
+def decoder():
+    table = []
+    for unit in ALU.UNITS:
+        decode = words(unit).decode
+        for raw in range(512):
+            value = decode(tuple(raw >> (8 - k) & 1 for k in range(9)))
+            if isinstance(value, tuple):
+                value = value[0] | value[1] << 8
+            table.append(value)
+    return table
+
+
+def batch(netlist, table, codes):
+    n = len(codes)
+    rows = [format(c, '020b') for c in reversed(codes)]
+    columns = [int(''.join(column), 2) for column in zip(*rows)]
+    outputs = netlist.evaluate_bits(columns, n)
+    bits = [format(o, f'0{n}b')[::-1] for o in outputs]
+    return [table[c >> 16 << 9 | int(''.join(raw), 2)] for c, raw in zip(codes, zip(*bits))]
+
+
+def execute(program, lanes=1 << 12):
+    netlist = optimized(ALU)
+    table = decoder()
+    results = array('H')
+    start = time.perf_counter()
+    codes = []
+    for op, a, b in instructions(program):
+        if not (0 <= op < len(ALU.UNITS) and 0 <= a < 256 and 0 <= b < 256):
+            raise CircuitError(f"Bad instruction ({op}, {a}, {b}) at {len(results) + len(codes)}")
+        codes.append(op << 16 | a << 8 | b)
+        if len(codes) == lanes:
+            results.extend(batch(netlist, table, codes))
+            codes = []
+    if codes:
+        results.extend(batch(netlist, table, codes))
+    elapsed = time.perf_counter() - start
+    return results, len(results) / elapsed if elapsed else 0.0
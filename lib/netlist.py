@@ -0,0 +1,440 @@
+from functools import lru_cache
+from heapq import heappop, heappush
+
+from lib.core import Input
+from lib.utils import CircuitError
+
+ZERO = 0
+ONE = 1
+
+
+class Netlist:
+    def __init__(self, name):
+        self.name = name
+        self.size = 2
+        self.gates = []
+        self.names = []
+        self.delays = []
+        self.inputs = []
+        self.outputs = []
+        self.states = []
+        self.order = None
+        self.levels = None
+        self.drivers = None
+        self.ranks = None
+        self.readers = None
+        self.evaluated = 0
+
+    def __len__(self):
+        return len(self.gates)
+
+    def wire(self):
+        self.size += 1
+        return self.size - 1
+
+    def add(self, op, out, ins, name, delay=1):
+        self.gates.append((op, out, tuple(ins)))
+        self.names.append(name)
+        self.delays.append(delay)
+        return out
+
+    def combinational(self):
+        if self.states:
+            raise CircuitError(f"{self.name} has {len(self.states)} flip-flops; clock it with lib.sequential.Clock")
+
+    def values(self, inputs):
+        self.combinational()
+        if len(inputs) != len(self.inputs):
+            raise CircuitError(f"{self.name} takes {len(self.inputs)} inputs, got {len(inputs)}")
+        values = [0] * self.size
+        values[ONE] = 1
+        for w, v in zip(self.inputs, inputs):
+            values[w] = 1 if v else 0
+        return values
+
+    def simulate(self, inputs):
+        values = self.relax(self.values(inputs))
+        return [values[w] for w in self.outputs]
+
+    def relax(self, values):
+        for _ in range(len(self.gates) + 1):
+            changed = False
+            for op, out, ins in self.gates:
+                v = gate(op, values, ins)
+                if values[out] != v:
+                    values[out] = v
+                    changed = True
+            if not changed:
+                return values
+        raise CircuitError(f"{self.name} does not settle")
+
+    def levelize(self):
+        if self.order is not None:
+            return self.order
+        drivers = {out: i for i, (op, out, ins) in enumerate(self.gates)}
+        fanout = [[] for _ in self.gates]
+        pending = [0] * len(self.gates)
+        for i, (op, out, ins) in enumerate(self.gates):
+            for w in set(ins):
+                if w in drivers:
+                    fanout[drivers[w]].append(i)
+                    pending[i] += 1
+        levels = [0] * len(self.gates)
+        ready = [i for i, p in enumerate(pending) if not p]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for j in fanout[i]:
+                levels[j] = max(levels[j], levels[i] + 1)
+                pending[j] -= 1
+                if not pending[j]:
+                    ready.append(j)
+        if len(order) < len(self.gates):
+            loop = [self.names[i] for i, p in enumerate(pending) if p]
+            raise CircuitError(f"Combinational loop in {self.name}: {', '.join(loop)}")
+        order.sort(key=levels.__getitem__)
+        self.drivers = drivers
+        self.levels = levels
+        self.order = order
+        return order
+
+    def evaluate(self, inputs):
+        values = self.values(inputs)
+        gates = self.gates
+        for i in self.levelize():
+            op, out, ins = gates[i]
+            values[out] = gate(op, values, ins)
+        return [values[w] for w in self.outputs]
+
+    def demand(self, inputs):
+        values = self.values(inputs)
+        self.levelize()
+        gates = self.gates
+        drivers = self.drivers
+        operands = self.operands()
+        known = set()
+
+        def get(w):
+            if w not in drivers or w in known:
+                return values[w]
+            i = drivers[w]
+            op, out, ins = gates[i]
+            self.evaluated += 1
+            if op == 'BUF':
+                v = get(ins[0])
+            elif op == 'NOT':
+                v = 1 - get(ins[0])
+            else:
+                a, b = operands[i]
+                if b in known and a not in known:
+                    a, b = b, a
+                v = get(a)
+                if v == (op == 'AND'):
+                    v = get(b)
+            values[w] = v
+            known.add(w)
+            return v
+
+        self.evaluated = 0
+        return [get(w) for w in self.outputs]
+
+    def operands(self):
+        if self.ranks is None:
+            fanout = {}
+            cones = {}
+            for op, out, ins in self.gates:
+                for w in ins:
+                    fanout[w] = fanout.get(w, 0) + 1
+            for i in self.levelize():
+                op, out, ins = self.gates[i]
+                cone = 1 << i
+                for w in ins:
+                    cone |= cones.get(w, 0)
+                cones[out] = cone
+
+            def rank(w):
+                return bin(cones.get(w, 0)).count('1') / fanout[w]
+
+            self.ranks = [tuple(sorted(ins, key=rank)) for op, out, ins in self.gates]
+        return self.ranks
+
+    def fanout(self):
+        if self.readers is None:
+            readers = [[] for _ in range(self.size)]
+            for rank, i in enumerate(self.levelize()):
+                for w in set(self.gates[i][2]):
+                    readers[w].append(rank)
+            self.readers = readers
+        return self.readers
+
+    def evaluate_bits(self, columns, lanes):
+        self.combinational()
+        mask = (1 << lanes) - 1
+        values = [0] * self.size
+        values[ONE] = mask
+        for w, column in zip(self.inputs, columns):
+            values[w] = column & mask
+        gates = self.gates
+        for i in self.levelize():
+            op, out, ins = gates[i]
+            if op == 'NOT':
+                values[out] = values[ins[0]] ^ mask
+            elif op == 'AND':
+                values[out] = values[ins[0]] & values[ins[1]]
+            else:
+                values[out] = values[ins[0]] | values[ins[1]]
+        return [values[w] for w in self.outputs]
+
+
+class Incremental:
+    def __init__(self, netlist):
+        self.netlist = netlist
+        self.order = netlist.levelize()
+        self.readers = netlist.fanout()
+        self.values = None
+        self.evaluated = 0
+
+    def evaluate(self, inputs):
+        netlist = self.netlist
+        if self.values is None:
+            self.values = netlist.values(inputs)
+            return self.settle(range(len(self.order)))
+        if len(inputs) != len(netlist.inputs):
+            raise CircuitError(f"{netlist.name} takes {len(netlist.inputs)} inputs, got {len(inputs)}")
+        pending = []
+        for w, v in zip(netlist.inputs, inputs):
+            v = 1 if v else 0
+            if self.values[w] != v:
+                self.values[w] = v
+                pending.extend(self.readers[w])
+        return self.settle(pending)
+
+    def flip(self, k):
+        if self.values is None:
+            self.evaluate([0] * len(self.netlist.inputs))
+        w = self.netlist.inputs[k]
+        self.values[w] ^= 1
+        return self.settle(self.readers[w])
+
+    def settle(self, pending):
+        values = self.values
+        gates = self.netlist.gates
+        order = self.order
+        readers = self.readers
+        heap = []
+        queued = set()
+        for rank in pending:
+            if rank not in queued:
+                queued.add(rank)
+                heappush(heap, rank)
+        self.evaluated = 0
+        while heap:
+            op, out, ins = gates[order[heappop(heap)]]
+            v = gate(op, values, ins)
+            self.evaluated += 1
+            if values[out] != v:
+                values[out] = v
+                for rank in readers[out]:
+                    if rank not in queued:
+                        queued.add(rank)
+                        heappush(heap, rank)
+        return [values[w] for w in self.netlist.outputs]
+
+
+def gate(op, values, ins):
+    if op == 'BUF':
+        return values[ins[0]]
+    if op == 'NOT':
+        return 1 - values[ins[0]]
+    if op == 'AND':
+        return values[ins[0]] & values[ins[1]]
+    return values[ins[0]] | values[ins[1]]
+
+
+def optimize(netlist):
+    result = Netlist(netlist.name)
+    alias = {ZERO: ZERO, ONE: ONE}
+    for w in netlist.inputs:
+        alias[w] = result.wire()
+        result.inputs.append(alias[w])
+    for q, d in netlist.states:
+        alias[q] = result.wire()
+    table = {}
+    complement = {ZERO: ONE, ONE: ZERO}
+    for i in netlist.levelize():
+        op, out, ins = netlist.gates[i]
+        ins = tuple(alias[w] for w in ins)
+        a = ins[0]
+        if op == 'BUF':
+            alias[out] = a
+            continue
+        if op == 'NOT':
+            if a in complement:
+                alias[out] = complement[a]
+                continue
+        else:
+            b = ins[1]
+            absorb, keep = (ZERO, ONE) if op == 'AND' else (ONE, ZERO)
+            if absorb in ins or complement.get(a) == b:
+                alias[out] = absorb
+                continue
+            if a == keep or a == b:
+                alias[out] = b
+                continue
+            if b == keep:
+                alias[out] = a
+                continue
+            ins = tuple(sorted(ins))
+        key = (op, ins)
+        if key not in table:
+            table[key] = result.add(op, result.wire(), ins, netlist.names[i], netlist.delays[i])
+            if op == 'NOT':
+                complement[table[key]] = a
+                complement.setdefault(a, table[key])
+        alias[out] = table[key]
+    result.outputs = [alias[w] for w in netlist.outputs]
+    result.states = [(alias[q], alias[d]) for q, d in netlist.states]
+    return prune(result)
+
+
+def prune(netlist):
+    drivers = {out: i for i, (op, out, ins) in enumerate(netlist.gates)}
+    live = set()
+    stack = [w for w in netlist.outputs + [d for q, d in netlist.states] if w in drivers]
+    while stack:
+        i = drivers[stack.pop()]
+        if i not in live:
+            live.add(i)
+            stack.extend(w for w in netlist.gates[i][2] if w in drivers)
+    gates = netlist.gates
+    names = netlist.names
+    delays = netlist.delays
+    netlist.gates = [gates[i] for i in sorted(live)]
+    netlist.names = [names[i] for i in sorted(live)]
+    netlist.delays = [delays[i] for i in sorted(live)]
+    return netlist
+
+
+@lru_cache(maxsize=None)
+def optimized(cls):
+    return optimize(elaborate(cls))
+
+
+@lru_cache(maxsize=None)
+def elaborate(cls, bridges=False):
+    return Elaborator(cls, bridges).netlist
+
+
+class Elaborator:
+    def __init__(self, cls, bridges=False):
+        self.keep = bridges
+        self.root = cls()
+        self.root.build()
+        self.netlist = Netlist(cls.__name__)
+        self.parent = {}
+        self.paths = {}
+        self.sources = {}
+        self.wires = {}
+        self.wired = {}
+        self.pending = set()
+        gates = []
+        flops = []
+        inputs = []
+        conductors = []
+        self.collect(self.root, cls.__name__, gates, flops, inputs, conductors)
+        for c in conductors:
+            if len(c.contacts) == 1:
+                self.union(c.contacts[0], c)
+        for contact in inputs:
+            if len(contact.conductors) == 1:
+                self.union(contact.conductors[0], contact)
+        for c in conductors:
+            if len(c.contacts) != 1:
+                self.sources[self.find(id(c))] = c
+        for contact in inputs:
+            if len(contact.conductors) > 1:
+                self.sources[self.find(id(contact))] = contact
+        for name, contact in self.root._in_ports:
+            w = self.netlist.wire()
+            self.netlist.inputs.append(w)
+            self.wires[self.find(id(contact))] = w
+        states = []
+        for e in flops:
+            states.append(self.netlist.wire())
+            self.wires[self.find(id(e.out1))] = states[-1]
+        outs = []
+        for e, path in gates:
+            outs.append(self.netlist.wire())
+            self.wires[self.find(id(e.out1))] = outs[-1]
+        for (e, path), out in zip(gates, outs):
+            ins = [self.net(e.in1)]
+            if e.OP in ('AND', 'OR'):
+                ins.append(self.net(e.in2))
+            self.netlist.add(e.OP, out, ins, path, e.DELAY)
+        for name, contact in self.root._out_ports:
+            self.netlist.outputs.append(self.net(contact))
+        for e, q in zip(flops, states):
+            self.netlist.states.append((q, self.net(e.in1)))
+
+    def find(self, key):
+        parent = self.parent
+        parent.setdefault(key, key)
+        root = key
+        while parent[root] != root:
+            root = parent[root]
+        while parent[key] != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(id(a)), self.find(id(b))
+        if a != b:
+            self.parent[b] = a
+
+    def collect(self, circuit, path, gates, flops, inputs, conductors):
+        for name, contact in circuit._in_ports + circuit._out_ports:
+            self.paths.setdefault(id(contact), f"{path}.{name}")
+            if isinstance(contact, Input):
+                inputs.append(contact)
+        conductors.extend(circuit._conductors)
+        if circuit.OP == 'BUF' and not self.keep:
+            self.union(circuit.in1, circuit.out1)
+        elif circuit.OP == 'DFF':
+            flops.append(circuit)
+        elif circuit.OP:
+            gates.append((circuit, path))
+        for names in circuit.ELEMENTS.values():
+            for n in names:
+                self.collect(getattr(circuit, n), f"{path}.{n}", gates, flops, inputs, conductors)
+
+    def net(self, item):
+        root = self.find(id(item))
+        if root in self.wires:
+            return self.wires[root]
+        if root in self.pending:
+            raise CircuitError(f"Bridge loop at {self.paths.get(id(item), '?')}")
+        self.pending.add(root)
+        source = self.sources.get(root)
+        if isinstance(source, Input):
+            parts = source.conductors
+            name = self.paths.get(id(source), '?')
+        elif source is not None:
+            parts = source.contacts
+            name = self.paths.get(id(source.fanout[0]), '?') if source.fanout else '?'
+        else:
+            parts = ()
+        drivers = []
+        for p in parts:
+            d = self.net(p)
+            if d != ZERO and d not in drivers:
+                drivers.append(d)
+        key = frozenset(drivers)
+        if key not in self.wired:
+            w = drivers[0] if drivers else ZERO
+            for d in drivers[1:]:
+                w = self.netlist.add('OR', self.netlist.wire(), (w, d), f"{name}.wor", 0)
+            self.wired[key] = w
+        self.pending.discard(root)
+        self.wires[root] = self.wired[key]
+        return self.wires[root]
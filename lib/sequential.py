@@ -0,0 +1,41 @@
+from lib.codegen import compile
+from lib.netlist import optimized
+from lib.utils import CircuitError
+
+
+class Clock:
+    def __init__(self, cls):
+        netlist = optimized(cls)
+        if not netlist.states:
+            raise CircuitError(f"{cls.__name__} has no flip-flops")
+        self.name = cls.__name__
+        self.function = compile(cls)
+        self.n = len(netlist.outputs)
+        self.size = len(netlist.inputs)
+        self.width = len(netlist.states)
+        self.reset()
+
+    def reset(self):
+        self.state = (0,) * self.width
+        self.cycles = 0
+
+    def tick(self, *inputs):
+        if len(inputs) != self.size:
+            raise CircuitError(f"{self.name} takes {self.size} inputs, got {len(inputs)}")
+        values = self.function(*inputs, *self.state)
+        self.state = values[self.n:]
+        self.cycles += 1
+        return values[:self.n]
+
+    def run(self, vectors):
+        function = self.function
+        n = self.n
+        state = self.state
+        outputs = []
+        for inputs in vectors:
+            values = function(*inputs, *state)
+            state = values[n:]
+            outputs.append(values[:n])
+        self.cycles += len(outputs)
+        self.state = state
+        return outputs
@@ -0,0 +1,47 @@
+import asyncio
+
+from lib.batch import unpack
+from lib.netlist import optimized
+from lib.utils import CircuitError
+
+DONE = object()
+
+
+async def feed(vectors, queue):
+    try:
+        async for vector in vectors:
+            await queue.put(tuple(vector))
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(DONE)
+
+
+async def stream(cls, vectors, batch=256):
+    netlist = optimized(cls)
+    n = len(netlist.inputs)
+    queue = asyncio.Queue(batch)
+    producer = asyncio.ensure_future(feed(vectors, queue))
+    try:
+        end = None
+        while end is None:
+            chunk = [await queue.get()]
+            while len(chunk) < batch and not queue.empty():
+                chunk.append(queue.get_nowait())
+            if chunk[-1] is DONE or isinstance(chunk[-1], Exception):
+                end = chunk.pop()
+            if not chunk:
+                continue
+            columns = [0] * n
+            for lane, vector in enumerate(chunk):
+                if len(vector) != n:
+                    raise CircuitError(f"{netlist.name} takes {n} inputs, got {len(vector)}")
+                for k, v in enumerate(vector):
+                    if v:
+                        columns[k] |= 1 << lane
+            for outputs in unpack(netlist.evaluate_bits(columns, len(chunk)), len(chunk)):
+                yield outputs
+        if end is not DONE:
+            raise end
+    finally:
+        producer.cancel()
@@ -0,0 +1,116 @@
+from lib.netlist import elaborate, gate
+from lib.utils import CircuitError
+
+
+class TimingWheel:
+    def __init__(self, span):
+        self.size = 1 << max(span, 1).bit_length()
+        self.mask = self.size - 1
+        self.buckets = [[] for _ in range(self.size)]
+        self.time = 0
+        self.count = 0
+
+    def schedule(self, delay, event):
+        if delay >= self.size:
+            raise CircuitError(f"Delay {delay} does not fit a wheel of {self.size} slots")
+        self.buckets[(self.time + delay) & self.mask].append(event)
+        self.count += 1
+
+    def advance(self):
+        if not self.count:
+            return None
+        while not self.buckets[self.time & self.mask]:
+            self.time += 1
+        events = self.buckets[self.time & self.mask]
+        self.buckets[self.time & self.mask] = []
+        self.count -= len(events)
+        return self.time, events
+
+
+class Timing:
+    def __init__(self, name, outputs, initial, events):
+        self.name = name
+        self.outputs = outputs
+        self.events = events
+        self.settles = [transitions[-1][0] if transitions else 0 for transitions in outputs]
+        self.settle = max(self.settles, default=0)
+        self.glitches = [
+            (len(transitions) - (transitions[-1][1] != start)) // 2 if transitions else 0
+            for transitions, start in zip(outputs, initial)
+        ]
+
+    def __str__(self):
+        lines = [f"{self.name}: settles at t={self.settle}, {self.events} events, {sum(self.glitches)} glitches"]
+        for i, (transitions, settle, glitches) in enumerate(zip(self.outputs, self.settles, self.glitches)):
+            if transitions:
+                changes = ', '.join(f"{v}@{t}" for t, v in transitions)
+                lines.append(f"out{i + 1}: {changes}, settles at t={settle}" + (f" ({glitches} glitches)" if glitches else ""))
+        return '\n'.join(lines)
+
+
+class TimingSimulator:
+    def __init__(self, cls, delays=None, limit=1000):
+        self.netlist = elaborate(cls)
+        self.delays = [
+            delays.get(op, delay) if delays and not name.endswith('.wor') else delay
+            for (op, out, ins), name, delay in zip(self.netlist.gates, self.netlist.names, self.netlist.delays)
+        ]
+        self.limit = limit
+        self.readers = [[] for _ in range(self.netlist.size)]
+        for i, (op, out, ins) in enumerate(self.netlist.gates):
+            for w in set(ins):
+                self.readers[w].append(i)
+        self.values = self.netlist.relax(self.netlist.values([0] * len(self.netlist.inputs)))
+
+    def apply(self, inputs):
+        netlist = self.netlist
+        if len(inputs) != len(netlist.inputs):
+            raise CircuitError(f"{netlist.name} takes {len(netlist.inputs)} inputs, got {len(inputs)}")
+        values = self.values
+        gates = netlist.gates
+        delays = self.delays
+        readers = self.readers
+        projected = list(values)
+        wheel = TimingWheel(max(delays, default=0) + 1)
+        for w, v in zip(netlist.inputs, inputs):
+            v = 1 if v else 0
+            if values[w] != v:
+                projected[w] = v
+                wheel.schedule(0, (w, v))
+        watched = {w: [] for w in netlist.outputs}
+        initial = [values[w] for w in netlist.outputs]
+        budget = self.limit * max(len(gates), 1)
+        events = 0
+        while True:
+            step = wheel.advance()
+            if step is None:
+                break
+            t, batch = step
+            events += len(batch)
+            if events > budget:
+                raise CircuitError(f"{netlist.name} does not settle")
+            dirty = {}
+            for w, v in batch:
+                if values[w] != v:
+                    values[w] = v
+                    if w in watched:
+                        watched[w].append((t, v))
+                    for i in readers[w]:
+                        dirty[i] = None
+            for i in dirty:
+                op, out, ins = gates[i]
+                v = gate(op, values, ins)
+                if projected[out] != v:
+                    projected[out] = v
+                    wheel.schedule(delays[i], (out, v))
+        return Timing(netlist.name, [list(watched[w]) for w in netlist.outputs], initial, events)
+
+
+def worst_case(cls, vectors, delays=None):
+    simulator = TimingSimulator(cls, delays)
+    worst = None
+    for inputs in vectors:
+        timing = simulator.apply(inputs)
+        if worst is None or timing.settle > worst[0].settle:
+            worst = (timing, tuple(inputs))
+    return worst
@@ -7,19 +7,29 @@ class Cell:
         self.value = None
 
 
+class Bus:
+    def __init__(self, name, width=8, lsb_first=False):
+        self.name = name
+        self.width = width
+        self.lsb_first = lsb_first
+
+    def shifts(self):
+        if self.lsb_first:
+            return list(range(self.width))
+        return list(reversed(range(self.width)))
+
+
 class Display:
     def __init__(self, n):
         self.n = n
-        for i in range(self.n):
-            setattr(self, f"c{i + 1}", Cell())
+        self.cells = [Cell() for _ in range(n)]
+        for i, cell in enumerate(self.cells):
+            setattr(self, f"c{i + 1}", cell)
 
     def res(self):
         if self.n == 1:
-            return self.c1.value
-        r = []
-        for i in range(self.n):
-            r.append(getattr(self, f"c{i + 1}").value)
-        return r
+            return self.cells[0].value
+        return [cell.value for cell in self.cells]
 
     def __str__(self):
         return ' '.join(map(str, self.res()))
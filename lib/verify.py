@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from lib.batch import columns, unpack
+from lib.netlist import optimized
+
+
+class Report:
+    def __init__(self, name, total):
+        self.name = name
+        self.total = total
+        self.checked = 0
+        self.failed = 0
+        self.mismatches = []
+
+    def __bool__(self):
+        return not self.failed
+
+    def __str__(self):
+        lines = [f"{self.name}: {self.checked}/{self.total} vectors checked, {self.failed} mismatches"]
+        for inputs, output, correct in self.mismatches:
+            lines.append(f"Input: {inputs}, output: {output}, correct: {correct}")
+        return '\n'.join(lines)
+
+
+def expected(value):
+    if value is None:
+        return None
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return tuple(int(bool(v)) for v in value)
+
+
+def check(cls, reference, start, bits, limit):
+    netlist = optimized(cls)
+    n = len(netlist.inputs)
+    lanes = 1 << bits
+    outputs = unpack(netlist.evaluate_bits(columns(n, start, lanes), lanes), lanes)
+    prefix = tuple(start >> (n - 1 - i) & 1 for i in range(n - bits))
+    checked = 0
+    failed = 0
+    mismatches = []
+    for suffix, output in zip(product((0, 1), repeat=bits), outputs):
+        inputs = prefix + suffix
+        correct = expected(reference(*inputs))
+        if correct is None:
+            continue
+        checked += 1
+        if output != correct:
+            failed += 1
+            if len(mismatches) < limit:
+                mismatches.append((inputs, output, correct))
+    return checked, failed, mismatches
+
+
+def verify(cls, reference, workers=None, shards=None, limit=20):
+    n = len(optimized(cls).inputs)
+    shards = shards or 4 * (workers or os.cpu_count() or 1)
+    bits = max(0, n - (shards - 1).bit_length())
+    report = Report(cls.__name__, 1 << n)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(check, cls, reference, start, bits, limit)
+            for start in range(0, 1 << n, 1 << bits)
+        ]
+        for future in futures:
+            checked, failed, mismatches = future.result()
+            report.checked += checked
+            report.failed += failed
+            report.mismatches.extend(mismatches[:limit - len(report.mismatches)])
+    return report
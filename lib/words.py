@@ -0,0 +1,49 @@
+from functools import lru_cache
+
+from lib.codegen import compile
+from lib.netlist import optimized
+from lib.utils import CircuitError
+
+
+class Words:
+    def __init__(self, cls):
+        netlist = optimized(cls)
+        self.name = cls.__name__
+        self.function = compile(cls)
+        self.names = [bus.name for bus in cls.IN_BUSES]
+        self.widths = [bus.width for bus in cls.IN_BUSES]
+        self.inputs = [(k, shift) for k, bus in enumerate(cls.IN_BUSES) for shift in bus.shifts()]
+        self.outputs = []
+        port = 0
+        for bus in cls.OUT_BUSES:
+            self.outputs.append(tuple(zip(range(port, port + bus.width), bus.shifts())))
+            port += bus.width
+        if len(self.inputs) != len(netlist.inputs) or port != len(netlist.outputs):
+            raise CircuitError(f"{self.name} buses do not match its {len(netlist.inputs)} inputs and {len(netlist.outputs)} outputs")
+
+    def encode(self, args, kwargs):
+        if len(args) > len(self.names):
+            raise CircuitError(f"{self.name} takes {len(self.names)} words, got {len(args)}")
+        words = list(args)
+        for name in self.names[len(args):]:
+            if name not in kwargs:
+                raise CircuitError(f"{self.name} missing word {name}")
+            words.append(kwargs.pop(name))
+        if kwargs:
+            raise CircuitError(f"{self.name} has no word {', '.join(kwargs)}")
+        for name, width, word in zip(self.names, self.widths, words):
+            if not 0 <= word < 1 << width:
+                raise CircuitError(f"{self.name} word {name}={word} does not fit in {width} bits")
+        return [words[k] >> shift & 1 for k, shift in self.inputs]
+
+    def decode(self, outputs):
+        result = tuple(sum(outputs[port] << shift for port, shift in bus) for bus in self.outputs)
+        return result[0] if len(result) == 1 else result
+
+    def __call__(self, *args, **kwargs):
+        return self.decode(self.function(*self.encode(args, kwargs)))
+
+
+@lru_cache(maxsize=None)
+def words(cls):
+    return Words(cls)
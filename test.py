@@ -1,16 +1,101 @@
+import asyncio
 import random
-from unittest import TestCase
+import tempfile
+from array import array
+from copy import copy
+from unittest import TestCase, skipIf
 from itertools import product
 
+from lib.core import C, Input, Output
 from lib.utils import Display, CircuitError
-from lib.circuit import NOR, NAND, XOR, AND3, OR3, XNOR, ODD, MT1, HADD, \
-    ADD, SC, NOT8, AND8, OR8, EQ8, NEQ8, GT8, LT8, GTE8, LTE8, ADD8, ALU
+from lib.netlist import elaborate, optimized
+from lib.codegen import compile
+from lib.verify import verify, check
+from lib.analysis import Analysis, passes
+from lib.sequential import Clock
+from lib.executor import execute
+from lib.timing import TimingSimulator, worst_case
+from lib.batch import np, sweep, gray_sweep, unpack, evaluate_batch, truth_table
+from lib.circuit import Circuit, NOT, AND, NOR, NAND, XOR, AND3, OR3, XNOR, ODD, MT1, HADD, \
+    ADD, SC, NOT8, AND8, OR8, EQ8, NEQ8, GT8, LT8, GTE8, LTE8, ADD8, ALU, REG, REGFILE, ACC8
+
+
+class Ring(Circuit):
+    ELEMENTS = {NOT: ('n1',)}
+
+    def inout(self):
+        return {'out1': self.n1.out1}
+
+    def connect(self):
+        return ((self.n1.out1, self.n1.in1),)
+
+
+class AND2(Circuit):
+    ELEMENTS = {NAND: ('n1',), NOT: ('n2',)}
+
+    def inout(self):
+        return {'in1': self.n1.in1, 'in2': self.n1.in2, 'out1': self.n2.out1}
+
+    def connect(self):
+        return ((self.n1.out1, self.n2.in1),)
+
+
+class Latch(Circuit):
+    ELEMENTS = {NOR: ('n1', 'n2')}
+
+    def inout(self):
+        return {'in1': self.n1.in1, 'in2': self.n2.in1, 'out1': self.n1.out1, 'out2': self.n2.out1}
+
+    def connect(self):
+        return ((self.n1.out1, self.n2.in2), (self.n2.out1, self.n1.in2))
+
+
+class Wired(Circuit):
+    ELEMENTS = {NOT: ('n1', 'n2', 'n3')}
+
+    def inout(self):
+        return {'in1': self.n1.in1, 'in2': self.n2.in1, 'out1': self.n3.out1}
+
+    def connect(self):
+        return ((self.n1.out1, self.n2.out1, self.n3.in1),)
+
+
+class AndNot(Circuit):
+    ELEMENTS = {NOT: ('n1',), AND: ('a1',)}
+
+    def inout(self):
+        return {'in2': self.n1.in1, 'in1': self.a1.in1, 'out1': self.a1.out1}
+
+    def connect(self):
+        return ((self.n1.out1, self.a1.in2),)
+
+
+class Shared(Circuit):
+    ELEMENTS = {NOT: ('n1', 'n2', 'n3', 'n4')}
+
+    def inout(self):
+        return {'in1': self.n1.in1, 'in2': self.n2.in1, 'out1': self.n3.out1, 'out2': self.n4.out1}
+
+    def connect(self):
+        return ((self.n1.out1, self.n2.out1, self.n3.in1), (self.n1.out1, self.n4.in1))
+
+
+class Gates(list):
+    def __init__(self, gates):
+        super().__init__(gates)
+        self.seen = set()
+
+    def __getitem__(self, i):
+        self.seen.add(i)
+        return super().__getitem__(i)
 
 
 class BaseTest(TestCase):
     IN = 0
     OUT = 0
     CIRCUIT = None
+    SEED = 0
+    SAMPLE = 0.01
 
     @staticmethod
     def F(*args):
@@ -22,9 +107,10 @@ class BaseTest(TestCase):
 
     def init_tm(self):
         self.TM = {}
+        rnd = random.Random(self.SEED)
         for i in product((0, 1), repeat=self.IN):
             if self.IN >= 10:
-                if random.random() > 0.01:
+                if rnd.random() > self.SAMPLE:
                     continue
             self.TM[i] = self.F(*i)
 
@@ -43,15 +129,38 @@ class BaseTest(TestCase):
             return
         if not self.CIRCUIT.ELEMENTS:
             raise CircuitError("Empty scheme")
+        c, d = None, None
         for inputs, outputs in self.TM.items():
             if outputs is None:
                 continue
-            c, d = self.init_circuit(inputs)
+            if c is None:
+                c, d = self.init_circuit(inputs)
+            else:
+                c.reset()
+                c.set_inputs(*inputs)
             c.run()
             if not d.check(outputs):
                 print(f"Input: {inputs}, output: {d.res()}, correct: {outputs}")
                 raise Exception
 
+    def exhaustive(self, bits=12):
+        checked = 0
+        bits = min(bits, self.IN)
+        for start in range(0, 1 << self.IN, 1 << bits):
+            n, failed, mismatches = check(self.CIRCUIT, self.F, start, bits, 1)
+            checked += n
+            if failed:
+                inputs, output, correct = mismatches[0]
+                self.fail(f"Input: {inputs}, output: {output}, correct: {correct}")
+        return checked
+
+    def test_exhaustive(self):
+        if not self.CIRCUIT:
+            return
+        if not self.CIRCUIT.ELEMENTS:
+            raise CircuitError("Empty scheme")
+        self.assertGreater(self.exhaustive(), 0)
+
 
 class TestNOR(BaseTest):
     IN = 2
@@ -281,6 +390,7 @@ class TestALU(BaseTest):
     IN = 20
     OUT = 9
     CIRCUIT = ALU
+    SAMPLE = 0.0002
     TESTS = {
         0: TestNOT8,
         1: TestOR8,
@@ -309,3 +419,625 @@ class TestALU(BaseTest):
         res += [0] * (9 - len(res))
 
         return res
+
+
+class TestNetlist(TestCase):
+    def test_bridges(self):
+        n = elaborate(XOR)
+        self.assertEqual(sorted(op for op, _, _ in n.gates), ['AND', 'AND', 'NOT', 'OR'])
+        self.assertEqual(len(n.inputs), 2)
+        self.assertEqual(len(n.outputs), 1)
+
+    def test_simulate(self):
+        for test in (TestSC, TestADD8, TestGT8):
+            n = elaborate(test.CIRCUIT)
+            for inputs, outputs in test().TM.items():
+                outputs = outputs if isinstance(outputs, list) else [outputs]
+                self.assertEqual(n.simulate(inputs), [int(bool(o)) for o in outputs])
+
+    def test_levelized(self):
+        for test in (TestMT1, TestADD8, TestLTE8):
+            n = elaborate(test.CIRCUIT)
+            for inputs in test().TM:
+                self.assertEqual(n.evaluate(inputs), n.simulate(inputs))
+        c, d = TestADD8().init_circuit((1,) * 16)
+        c.evaluate()
+        self.assertTrue(d.check(TestADD8.F(*(1,) * 16)))
+
+    def test_loop(self):
+        with self.assertRaises(CircuitError):
+            elaborate(Ring).evaluate(())
+
+    def test_port_order(self):
+        expected = [(a and not b,) for a, b in product((0, 1), repeat=2)]
+        self.assertEqual([tuple(elaborate(AndNot).evaluate(i)) for i in product((0, 1), repeat=2)], expected)
+        self.assertEqual([tuple(optimized(AndNot).evaluate(i)) for i in product((0, 1), repeat=2)], expected)
+        self.assertEqual([compile(AndNot)(*i) for i in product((0, 1), repeat=2)], expected)
+        self.assertEqual(check(AndNot, lambda a, b: a and not b, 0, 2, 1)[:2], (4, 0))
+
+    def test_wired_or(self):
+        n = elaborate(Wired)
+        self.assertEqual(sum(name.endswith('.wor') for name in n.names), 1)
+        for inputs in product((0, 1), repeat=2):
+            c = Wired().set_inputs(*inputs)
+            c.run(converge=True)
+            self.assertEqual(n.evaluate(inputs), c.outputs())
+            self.assertEqual(c.outputs(), [inputs[0] & inputs[1]])
+        self.assertFalse(any(name.endswith('.wor') for name in elaborate(ALU).names))
+        n = elaborate(Shared)
+        for inputs in product((0, 1), repeat=2):
+            c = Shared().set_inputs(*inputs)
+            c.run(converge=True)
+            self.assertEqual(n.evaluate(inputs), c.outputs())
+        self.assertEqual(n.evaluate((1, 0)), [0, 1])
+        self.assertEqual(sum(name.endswith('.wor') for name in n.names), 1)
+
+
+class TestEvents(TestCase):
+    def test_propagate(self):
+        for test in (TestSC, TestADD8):
+            t = test()
+            for inputs in list(t.TM)[:50]:
+                c, d = t.init_circuit(inputs)
+                c.propagate()
+                self.assertTrue(d.check(t.TM[inputs]))
+
+    def test_quiet_cone(self):
+        c, d = TestGT8().init_circuit((0,) * 16)
+        self.assertLess(c.propagate(), 100 * len(c._events.gates))
+        c.set_inputs(in16=1)
+        self.assertLess(c.propagate(), 10)
+        self.assertEqual(d.res(), 0)
+
+
+class TestConverge(TestCase):
+    def test_passes(self):
+        c, d = TestNOR().init_circuit((0, 0))
+        self.assertLessEqual(c.run(converge=True), 3)
+        self.assertEqual(d.res(), 1)
+        c, d = TestADD8().init_circuit((1,) * 16)
+        self.assertLess(c.run(converge=True), 100)
+        self.assertTrue(d.check(TestADD8.F(*(1,) * 16)))
+
+    def test_latch(self):
+        c = Latch()
+        for inputs, outputs in (((0, 1), [1, 0]), ((0, 0), [1, 0]), ((1, 0), [0, 1]), ((0, 0), [0, 1])):
+            c.set_inputs(*inputs)
+            c.run()
+            self.assertEqual(c.outputs(), outputs)
+        self.assertIsNone(passes(Latch))
+
+    def test_oscillation(self):
+        with self.assertRaises(CircuitError):
+            Ring().run(converge=True)
+
+
+class TestBitSliced(TestCase):
+    def test_exhaustive(self):
+        for test in (TestSC, TestGT8):
+            vectors = product((0, 1), repeat=test.IN)
+            for start, count, outputs in sweep(test.CIRCUIT):
+                for result, inputs in zip(unpack(outputs, count), vectors):
+                    expected = test.F(*inputs)
+                    expected = expected if isinstance(expected, list) else [expected]
+                    self.assertEqual(list(result), [int(bool(o)) for o in expected], inputs)
+
+
+@skipIf(np is None, "numpy is not installed")
+class TestNumpyBatch(TestCase):
+    def test_evaluate_batch(self):
+        inputs = np.array(list(product((0, 1), repeat=16)), dtype=np.uint8)
+        outputs = evaluate_batch(ADD8, inputs)
+        self.assertEqual(outputs.shape, (1 << 16, 9))
+        n = elaborate(ADD8)
+        for i in range(0, 1 << 16, 997):
+            self.assertEqual(list(outputs[i]), n.evaluate(inputs[i]))
+
+    def test_shape(self):
+        with self.assertRaises(CircuitError):
+            evaluate_batch(ADD8, np.zeros((4, 15), dtype=bool))
+
+
+class TestInstance(TestCase):
+    def test_reuse(self):
+        c = ADD8()
+        for inputs in list(TestADD8().TM)[:100]:
+            c.set_inputs(*inputs)
+            self.assertEqual(c.evaluate(), [int(o) for o in TestADD8.F(*inputs)])
+            self.assertEqual(c.outputs(), [int(o) for o in TestADD8.F(*inputs)])
+
+    def test_reset(self):
+        c, d = TestXOR().init_circuit((1, 0))
+        c.run()
+        self.assertEqual(d.res(), 1)
+        c.reset()
+        self.assertEqual(c.outputs(), [0])
+        c.set_inputs(in2=1)
+        c.run()
+        self.assertEqual(d.res(), 0)
+
+    def test_port_order(self):
+        for _ in range(2):
+            c = AndNot().set_inputs(1, 0)
+            self.assertEqual([n for n, p in c._in_ports], ['in1', 'in2'])
+            self.assertEqual(c.evaluate(), [1])
+            c.run()
+            self.assertEqual(c.outputs(), [1])
+            c.reset()
+            c.set_inputs(0, 1)
+            c.run()
+            self.assertEqual(c.outputs(), [0])
+
+    def test_bad_inputs(self):
+        with self.assertRaises(CircuitError):
+            XOR().set_inputs(1, 0, 1)
+        with self.assertRaises(CircuitError):
+            XOR().set_inputs(in3=1)
+
+
+class TestLUT(TestCase):
+    def setUp(self):
+        Circuit.LUT_INPUTS = 4
+
+    def tearDown(self):
+        Circuit.LUT_INPUTS = 0
+
+    def test_table(self):
+        self.assertEqual(truth_table(XOR), ((0,), (1,), (1,), (0,)))
+        self.assertEqual(truth_table(HADD)[3], (0, 1))
+
+    def test_lookup(self):
+        for test in (TestSC, TestMT1, TestADD8):
+            t = test()
+            t.TM = dict(list(t.TM.items())[:100])
+            t.test()
+
+    def test_sequential(self):
+        c = ACC8().set_inputs(*bits(3) + (1,))
+        self.assertEqual([c.clock() for _ in range(3)], [list(bits(0)), list(bits(3)), list(bits(6))])
+        with self.assertRaises(CircuitError):
+            truth_table(REG)
+
+    def test_feedback(self):
+        c = Latch().set_inputs(0, 1)
+        c.run()
+        self.assertEqual(c.outputs(), [1, 0])
+        c.set_inputs(0, 0)
+        c.run()
+        self.assertEqual(c.outputs(), [1, 0])
+        c.set_inputs(1, 0)
+        c.run()
+        self.assertEqual(c.outputs(), [0, 1])
+
+
+class TestCodegen(TestCase):
+    def test_compile(self):
+        for test in (TestXOR, TestSC, TestADD8, TestGTE8):
+            f = compile(test.CIRCUIT)
+            n = elaborate(test.CIRCUIT)
+            for inputs in test().TM:
+                self.assertEqual(list(f(*inputs)), n.evaluate(inputs))
+
+    def test_truthy_inputs(self):
+        c = XOR().set_inputs(2, 0)
+        self.assertEqual(c.evaluate(), [1])
+        self.assertEqual(c.evaluate(lazy=True), [1])
+        c.run()
+        self.assertEqual(c.outputs(), [1])
+
+    def test_cached(self):
+        self.assertIs(compile(ADD8), compile(ADD8))
+        self.assertIn('def ADD8(in1,', compile(ADD8).source)
+
+
+class TestCore(TestCase):
+    def test_slots(self):
+        a, b = Output(), Input()
+        c = C(a, b)
+        for obj in (a, b, c):
+            self.assertFalse(hasattr(obj, '__dict__'))
+        self.assertEqual((c.contacts, c.fanout, b.conductors), ((a,), (b,), (c,)))
+        a.value = 1
+        c.update()
+        b.update()
+        self.assertEqual(b.value, 1)
+
+
+class TestTemplate(TestCase):
+    def test_lazy(self):
+        GT8().build()
+        c = GT8()
+        self.assertIsNone(c._elements)
+        c.set_inputs(1, *[0] * 15)
+        self.assertEqual(c.evaluate(), [1])
+        c.run(20)
+        self.assertEqual(c.outputs(), [1])
+        self.assertEqual(len(c._elements), 39)
+
+    def test_port_identity(self):
+        NOR().build()
+        c = NOR()
+        o = c.out1
+        c.set_inputs(0, 0)
+        c.run()
+        self.assertIs(o, c.out1)
+        self.assertEqual(o.value, 1)
+        ADD8().build()
+        c = ADD8()
+        ports = [getattr(c, f"in{i + 1}") for i in range(16)]
+        c.set_inputs(*(1,) * 16)
+        c.run()
+        self.assertEqual(ports, [getattr(c, f"in{i + 1}") for i in range(16)])
+        self.assertEqual(c.outputs(), TestADD8.F(*(1,) * 16))
+
+    def test_external_wiring(self):
+        GT8().build()
+        n = NOT(in1=1)
+        c = GT8()
+        wire = C(n.out1, c.in1)
+        c.build()
+        self.assertEqual(c.in1.conductors, (wire,))
+        n.run()
+        wire.update()
+        c.run()
+        self.assertEqual(c.outputs(), [0])
+        n.set_inputs(0)
+        n.run()
+        wire.update()
+        c.run()
+        self.assertEqual(c.outputs(), [1])
+
+    def test_element_access(self):
+        XOR().build()
+        c, d = TestXOR().init_circuit((1, 1))
+        self.assertEqual(c.b1.OP, 'BUF')
+        c.run()
+        self.assertEqual(d.res(), 0)
+
+
+class TestVerify(TestCase):
+    def test_exhaustive(self):
+        report = verify(ADD8, TestADD8.F, workers=2)
+        self.assertTrue(report, str(report))
+        self.assertEqual(report.checked, 1 << 16)
+
+    def test_mismatches(self):
+        report = verify(GT8, TestLT8.F, workers=2, limit=3)
+        self.assertFalse(report)
+        self.assertEqual(report.failed, 65536 - 256)
+        self.assertEqual(report.mismatches[0][0], (0,) * 15 + (1,))
+        self.assertEqual(len(report.mismatches), 3)
+
+
+class TestExhaustiveMode(TestCase):
+    def test_coverage(self):
+        self.assertEqual(TestSC().exhaustive(), 8)
+        self.assertEqual(TestGT8().exhaustive(bits=10), 1 << 16)
+
+    def test_first_failure(self):
+        class Wrong(TestGT8):
+            F = staticmethod(TestLT8.F)
+
+        with self.assertRaises(AssertionError) as e:
+            Wrong().exhaustive()
+        self.assertIn(str((0,) * 15 + (1,)), str(e.exception))
+
+    def test_deterministic(self):
+        self.assertEqual(TestGT8().TM, TestGT8().TM)
+
+
+class TestBench(TestCase):
+    def test_measure(self):
+        import bench
+        result = bench.measure(NOR, 0.01)
+        self.assertEqual(result['gates'], 2)
+        self.assertIn(ALU, bench.circuits())
+        self.assertNotIn(NOT, bench.circuits())
+
+    def test_compare(self):
+        import bench
+        baseline = {'NOR': {'instantiate_us': 10, 'evals_per_sec': 100}}
+        self.assertEqual(bench.compare({'NOR': {'instantiate_us': 11, 'evals_per_sec': 90}}, baseline, 0.2), [])
+        self.assertEqual(len(bench.compare({'NOR': {'instantiate_us': 13, 'evals_per_sec': 70}}, baseline, 0.2)), 2)
+
+
+class TestAnalysis(TestCase):
+    def test_depth(self):
+        a = Analysis(ADD8)
+        self.assertEqual(a.depth, 20)
+        self.assertEqual(len(a.path), a.depth)
+        self.assertEqual(a.path[-1], 'ADD8.a8.h2.x1.a1')
+        self.assertEqual(sum(a.gates.values()), len(elaborate(ADD8)))
+        self.assertIn('critical path', str(a))
+
+    def test_passes(self):
+        self.assertEqual(passes(NOR), 3)
+        c, d = TestNOR().init_circuit((0, 0))
+        self.assertEqual(c.run(), 3)
+        self.assertEqual(d.res(), 1)
+
+
+class TestOptimize(TestCase):
+    def test_double_not(self):
+        self.assertEqual(len(elaborate(AND2)), 3)
+        self.assertEqual([op for op, out, ins in optimized(AND2).gates], ['AND'])
+
+    def test_constants(self):
+        self.assertEqual(len(elaborate(ADD8)), 99)
+        self.assertLess(len(optimized(ADD8)), 70)
+
+    def test_common_subexpressions(self):
+        self.assertEqual(len(elaborate(GTE8)), 134)
+        self.assertLess(len(optimized(GTE8)), 100)
+
+    def test_equivalent(self):
+        for test in (TestSC, TestADD8, TestLT8):
+            a, b = elaborate(test.CIRCUIT), optimized(test.CIRCUIT)
+            for inputs in test().TM:
+                self.assertEqual(a.evaluate(inputs), b.evaluate(inputs))
+
+
+class TestDemand(TestCase):
+    def test_equivalent(self):
+        n = optimized(ALU)
+        rnd = random.Random(0)
+        for _ in range(500):
+            inputs = [rnd.randint(0, 1) for _ in n.inputs]
+            self.assertEqual(n.demand(inputs), n.evaluate(inputs))
+
+    def test_gated(self):
+        n = copy(optimized(ALU))
+        inputs = [1, 0, 0, 1] + [1, 0] * 8
+        n.demand(inputs)
+        n.gates = Gates(n.gates)
+        n.demand(inputs)
+        units = {i for i, name in enumerate(n.names) if name.split('.')[1] in ('u0', 'u1', 'u2', 'u3', 'u4', 'u5', 'u6', 'u7', 'u8')}
+        self.assertEqual(len(n.gates.seen), n.evaluated)
+        self.assertTrue(units)
+        self.assertFalse(n.gates.seen & units)
+
+    def test_circuit(self):
+        inputs = [1, 0, 0, 1] + [1, 0, 1, 1, 0, 0, 1, 0] + [0, 1, 1, 0, 1, 0, 0, 1]
+        c = ALU().set_inputs(*inputs)
+        self.assertEqual(c.evaluate(lazy=True), TestALU.F(*inputs))
+        self.assertEqual(c.evaluate(), c.outputs())
+
+
+class TestIncremental(TestCase):
+    def test_sweep(self):
+        for test in (TestADD8, TestGT8):
+            c = test.CIRCUIT()
+            n = optimized(test.CIRCUIT)
+            a = (1, 0, 1, 1, 0, 1, 0, 0)
+            evaluated = 0
+            for b in product((0, 1), repeat=8):
+                c.set_inputs(*a + b)
+                self.assertEqual(c.evaluate(incremental=True), n.evaluate(a + b))
+                evaluated += c._incremental.evaluated
+            self.assertLess(evaluated, 256 * len(n) // 2)
+
+    def test_unchanged(self):
+        c = ADD8().set_inputs(*(1,) * 16)
+        c.evaluate(incremental=True)
+        self.assertEqual(c._incremental.evaluated, len(optimized(ADD8)))
+        self.assertEqual(c.evaluate(incremental=True), c.outputs())
+        self.assertEqual(c._incremental.evaluated, 0)
+        c.set_inputs(in16=0)
+        self.assertEqual(c.evaluate(incremental=True), c.evaluate())
+
+
+class TestGray(TestCase):
+    def test_exhaustive(self):
+        for cls in (GT8, ADD8):
+            table = truth_table(cls)
+            seen = set()
+            previous = None
+            for inputs, outputs in gray_sweep(cls):
+                k = int(''.join(map(str, inputs)), 2)
+                self.assertEqual(outputs, table[k])
+                if previous is not None:
+                    self.assertEqual(sum(a != b for a, b in zip(inputs, previous)), 1)
+                previous = inputs
+                seen.add(k)
+            self.assertEqual(len(seen), 1 << 16)
+
+
+class TestStream(TestCase):
+    def test_stream(self):
+        rnd = random.Random(0)
+        vectors = [tuple(rnd.randint(0, 1) for _ in range(16)) for _ in range(500)]
+
+        async def source():
+            for v in vectors:
+                yield v
+                await asyncio.sleep(0)
+
+        async def collect():
+            return [outputs async for outputs in ADD8().stream(source(), batch=64)]
+
+        self.assertEqual(asyncio.run(collect()), [tuple(optimized(ADD8).evaluate(v)) for v in vectors])
+
+    def test_backpressure(self):
+        produced = []
+
+        async def source():
+            for i in range(10000):
+                produced.append(i)
+                yield (i & 1, 1)
+
+        async def first():
+            async for outputs in XOR().stream(source(), batch=8):
+                return outputs, len(produced)
+
+        outputs, count = asyncio.run(first())
+        self.assertEqual(outputs, (1,))
+        self.assertLessEqual(count, 20)
+
+    def test_error(self):
+        async def source():
+            yield (1, 1)
+            yield (1,)
+
+        async def collect():
+            return [outputs async for outputs in XOR().stream(source())]
+
+        with self.assertRaises(CircuitError):
+            asyncio.run(collect())
+
+
+class TestWords(TestCase):
+    def test_units(self):
+        rnd = random.Random(0)
+        for _ in range(200):
+            a, b = rnd.randrange(256), rnd.randrange(256)
+            self.assertEqual(ADD8.eval_words(a=a, b=b), ((a + b) % 256, int(a + b > 255)))
+            self.assertEqual(GT8.eval_words(a, b), int(a > b))
+            self.assertEqual(EQ8.eval_words(a, a), 1)
+            self.assertEqual(NOT8.eval_words(a), a ^ 255)
+
+    def test_alu(self):
+        ops = (
+            lambda a, b: a ^ 255, lambda a, b: a | b, lambda a, b: a & b,
+            lambda a, b: int(a == b), lambda a, b: int(a != b), lambda a, b: int(a > b),
+            lambda a, b: int(a < b), lambda a, b: int(a >= b), lambda a, b: int(a <= b),
+            lambda a, b: ((a + b) % 256, int(a + b > 255)),
+        )
+        rnd = random.Random(0)
+        for _ in range(100):
+            a, b = rnd.randrange(256), rnd.randrange(256)
+            for op, f in enumerate(ops):
+                self.assertEqual(ALU.eval_words(op, a, b), f(a, b))
+        with self.assertRaises(CircuitError):
+            ALU.eval_words(12, 1, 2)
+
+    def test_errors(self):
+        with self.assertRaises(CircuitError):
+            ADD8.eval_words(1, 2, 3)
+        with self.assertRaises(CircuitError):
+            ADD8.eval_words(a=1, c=2)
+        with self.assertRaises(CircuitError):
+            XOR.eval_words(1)
+        with self.assertRaises(CircuitError):
+            ADD8.eval_words(300, 1)
+        with self.assertRaises(CircuitError):
+            ADD8.eval_words(1, -1)
+        with self.assertRaises(CircuitError):
+            ALU.eval_words(9, 256, 0)
+
+    def test_display(self):
+        d = Display(3)
+        d.c2.value = 1
+        self.assertEqual(d.res(), [None, 1, None])
+        self.assertIs(d.cells[1], d.c2)
+
+
+def bits(value, width=8):
+    return tuple(value >> i & 1 for i in reversed(range(width)))
+
+
+class TestSequential(TestCase):
+    def test_accumulator(self):
+        rnd = random.Random(0)
+        clock = Clock(ACC8)
+        acc = 0
+        for _ in range(500):
+            x, load = rnd.randrange(256), rnd.randint(0, 1)
+            self.assertEqual(clock.tick(*bits(x) + (load,)), bits(acc))
+            if load:
+                acc = (acc + x) % 256
+        self.assertEqual(clock.state, bits(acc))
+
+    def test_relaxation(self):
+        vectors = [bits(x) + (1,) for x in (3, 250, 7, 0, 1)]
+        c = ACC8()
+        expected = Clock(ACC8).run(vectors)
+        for inputs, outputs in zip(vectors, expected):
+            c.set_inputs(*inputs)
+            self.assertEqual(tuple(c.clock()), outputs)
+
+    def test_register_file(self):
+        rnd = random.Random(0)
+        clock = Clock(REGFILE)
+        registers = [0] * 4
+        for _ in range(500):
+            we, w, data, r = rnd.randint(0, 1), rnd.randrange(4), rnd.randrange(256), rnd.randrange(4)
+            self.assertEqual(clock.tick(we, *bits(w, 2), *bits(data), *bits(r, 2)), bits(registers[r]))
+            if we:
+                registers[w] = data
+
+    def test_combinational(self):
+        with self.assertRaises(CircuitError):
+            Clock(ADD8)
+
+    def test_stateless_evaluation(self):
+        c = ACC8().set_inputs(*bits(3) + (1,))
+        for evaluate in (c.evaluate, lambda: c.evaluate(lazy=True), lambda: c.evaluate(incremental=True)):
+            with self.assertRaises(CircuitError):
+                evaluate()
+        with self.assertRaises(CircuitError):
+            optimized(ACC8).evaluate(bits(3) + (1,))
+        with self.assertRaises(CircuitError):
+            truth_table(REGFILE)
+
+
+class TestExecutor(TestCase):
+    def test_program(self):
+        rnd = random.Random(0)
+        program = [(rnd.randrange(10), rnd.randrange(256), rnd.randrange(256)) for _ in range(1000)]
+        results, rate = execute(program, lanes=256)
+        self.assertEqual(results.typecode, 'H')
+        self.assertGreater(rate, 0)
+        for (op, a, b), result in zip(program, results):
+            expected = ALU.eval_words(op, a, b)
+            if op == 9:
+                expected = expected[0] | expected[1] << 8
+            self.assertEqual(result, expected)
+        packed = array('B', [x for instruction in program for x in instruction])
+        self.assertEqual(execute(packed)[0], results)
+        with tempfile.NamedTemporaryFile() as f:
+            packed.tofile(f)
+            f.flush()
+            self.assertEqual(execute(f.name)[0], results)
+
+    def test_errors(self):
+        with self.assertRaises(CircuitError):
+            execute([(10, 1, 2)])
+        with self.assertRaises(CircuitError):
+            execute(bytes([9, 1]))
+
+
+class TestTiming(TestCase):
+    def test_glitch(self):
+        simulator = TimingSimulator(XOR)
+        simulator.apply((0, 0))
+        timing = simulator.apply((1, 1))
+        self.assertEqual(timing.outputs, [[(2, 1), (3, 0)]])
+        self.assertEqual(timing.glitches, [1])
+        self.assertEqual(timing.settles, [3])
+
+    def test_ripple(self):
+        simulator = TimingSimulator(ADD8)
+        simulator.apply((1,) * 8 + (0,) * 8)
+        timing = simulator.apply((1,) * 8 + (0,) * 7 + (1,))
+        self.assertEqual(timing.outputs[8], [(16, 1)])
+        self.assertEqual(timing.settles, [5, 5, 7, 9, 11, 13, 15, 17, 16])
+        self.assertEqual(timing.settle, 17)
+        simulator = TimingSimulator(ADD8, delays={'AND': 2, 'OR': 2})
+        simulator.apply((1,) * 8 + (0,) * 8)
+        self.assertGreater(simulator.apply((1,) * 8 + (0,) * 7 + (1,)).settle, 17)
+
+    def test_worst_case(self):
+        rnd = random.Random(0)
+        vectors = [tuple(rnd.randint(0, 1) for _ in range(16)) for _ in range(300)]
+        for cls in (ADD8, GT8):
+            simulator = TimingSimulator(cls)
+            for inputs in vectors:
+                simulator.apply(inputs)
+                self.assertEqual([simulator.values[w] for w in simulator.netlist.outputs], elaborate(cls).evaluate(inputs))
+            timing, inputs = worst_case(cls, vectors)
+            self.assertLessEqual(timing.settle, Analysis(cls).depth)
+            self.assertIn(inputs, vectors)
+
+    def test_loop(self):
+        with self.assertRaises(CircuitError):
+            TimingSimulator(Ring)